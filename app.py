@@ -1,46 +1,52 @@
-import werkzeug
-werkzeug.urls.url_decode = werkzeug.urls.url_unquote 
-
-
-import flask_login
-from flask_login.utils import _create_identifier
-flask_login.utils._create_identifier = _create_identifier
-
 # Standard imports
-from dotenv import load_dotenv
 from decouple import config
 import os
 import atexit
-
-# Load environment variables FIRST
-load_dotenv()
+import csv
+import gzip
+import io
+import mimetypes
+import shutil
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 
 # Flask and extension imports
-from flask import Flask, render_template, request, redirect, url_for, flash
+import click
+from flask import (Blueprint, Flask, render_template, request, redirect, url_for, flash, jsonify, abort,
+                   current_app, has_request_context, send_from_directory, session, stream_with_context)
+from flask.cli import AppGroup
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager, UserMixin, login_user, login_required, current_user, logout_user
 from flask_bcrypt import Bcrypt
-from flask_mail import Mail, Message
-from config import Config
-from datetime import datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import contains_eager, make_transient_to_detached
+from config import config_by_name
+from metrics import Registry
+from datetime import datetime, timedelta, timezone, date as date_type
+from functools import lru_cache, partial, wraps
+from itertools import groupby
+from operator import attrgetter
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError, available_timezones
+import base64
+import hashlib
+import json
 import secrets
-from apscheduler.schedulers.background import BackgroundScheduler 
-from apscheduler.triggers.cron import CronTrigger
+import socket
 
-# Initialize extensions
+# Initialize extensions; create_app() binds them to an app. Flask-Mail and
+# APScheduler are only imported and set up when first needed.
 db = SQLAlchemy()
 bcrypt = Bcrypt()
-mail = Mail()
 login_manager = LoginManager()
-scheduler = BackgroundScheduler()
+login_manager.login_view = 'main.login'
 
-app = Flask(__name__)
-app.config.from_object(Config)
-db.init_app(app)
-bcrypt.init_app(app)
-mail.init_app(app)
-login_manager.init_app(app)
-login_manager.login_view = 'login'
+bp = Blueprint('main', __name__, cli_group=None)
 
 # User model
 class User(UserMixin, db.Model):
@@ -48,34 +54,509 @@ class User(UserMixin, db.Model):
     email = db.Column(db.String(100), unique=True, nullable=False)
     password = db.Column(db.String(100), nullable=False)
     phone = db.Column(db.String(20))
-    reset_token = db.Column(db.String(100))
     reminder_time = db.Column(db.String(5), default='08:00')
+    timezone = db.Column(db.String(50))
+    last_reminder_date = db.Column(db.Date)
+    # Bumped whenever the user's plants change; keys the dashboard summary cache
+    plants_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     plants = db.relationship('Plant', backref='owner', lazy=True)
 
+    # Lets the reminder dispatcher find users by their reminder slot
+    __table_args__ = (
+        db.Index('ix_user_timezone_reminder_time', 'timezone', 'reminder_time'),
+    )
+
 # Plant model
 class Plant(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     plant_type = db.Column(db.String(100))
-    last_watered = db.Column(db.String(20))
+    last_watered = db.Column(db.Date)
     water_frequency = db.Column(db.Integer, nullable=False)
+    next_due = db.Column(db.Date, index=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
 
+    # Dashboard ordering, per-user due checks and API type filters
+    __table_args__ = (
+        db.Index('ix_plant_user_id_name', 'user_id', 'name'),
+        db.Index('ix_plant_user_id_next_due', 'user_id', 'next_due'),
+        db.Index('ix_plant_user_id_plant_type', 'user_id', 'plant_type'),
+    )
+
     def __repr__(self):
         return f"Plant('{self.name}', '{self.plant_type}')"
 
-# CREATE TABLES - ADDED THIS
-with app.app_context():
+# Append-only log of every time a plant was watered
+class WateringEvent(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    plant_id = db.Column(db.Integer, db.ForeignKey('plant.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    watered_on = db.Column(db.Date, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # History pages walk one plant's events newest-first by id
+    __table_args__ = (
+        db.Index('ix_watering_event_plant_id_id', 'plant_id', 'id'),
+    )
+
+    def __repr__(self):
+        return f"WateringEvent({self.plant_id}, '{self.watered_on}')"
+
+# One row per plant per day a reminder went out; the unique constraint stops
+# two processes, or a retry after a restart, from sending the same reminder.
+# A row is 'pending' from when a run claims it until the SMTP server accepts
+# the digest; a pending claim left by a run that died mid-send goes stale
+# after REMINDER_CLAIM_TIMEOUT_MINUTES and is taken over by a later run.
+class ReminderSent(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    plant_id = db.Column(db.Integer, db.ForeignKey('plant.id'), nullable=False)
+    sent_on = db.Column(db.Date, nullable=False, index=True)
+    # Rows written before claims existed were all sent
+    status = db.Column(db.String(10), nullable=False, default='pending', server_default='sent')
+    claimed_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.UniqueConstraint('plant_id', 'sent_on', name='uq_reminder_sent_plant_id_sent_on'),
+    )
+
+# Outstanding password reset links. Only a SHA-256 of the token is stored
+# here. The reset email itself carries the plaintext link while it waits in
+# the outbox; its content is blanked once sent, and the row is deleted with
+# expired tokens by purge_password_reset_tokens().
+class PasswordResetToken(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    token_hash = db.Column(db.String(64), nullable=False, unique=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+def hash_reset_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+# Lease held by the one process allowed to run a scheduled job
+class SchedulerLease(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    holder = db.Column(db.String(100), nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+# Outgoing email waiting to be sent by the background outbox sender.
+# Sensitive emails (password resets) lose their html and body once sent or
+# given up on, so the outbox keeps no usable links.
+class OutboxEmail(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(100), nullable=False)
+    subject = db.Column(db.String(200), nullable=False)
+    html = db.Column(db.Text, nullable=False)
+    body = db.Column(db.Text)
+    status = db.Column(db.String(10), nullable=False, default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claim_token = db.Column(db.String(32))
+    last_error = db.Column(db.String(500))
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+    sensitive = db.Column(db.Boolean, nullable=False, default=False, server_default='0')
+
+    __table_args__ = (
+        db.Index('ix_outbox_email_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f"OutboxEmail('{self.recipient}', '{self.subject}', '{self.status}')"
+
+class LRUCache:
+    """Small thread-safe LRU cache with an optional time-to-live in seconds"""
+
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and (self.ttl is None or entry[1] > time.monotonic()):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def discard(self, predicate):
+        """Remove every entry whose key matches predicate(key)"""
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+def cache_lookup_counts():
+    """Hits and misses of this app's LRU caches, keyed by (cache, result)"""
+    counts = {}
+    for name, cache in current_app.extensions.items():
+        if isinstance(cache, LRUCache):
+            counts[(name, 'hit')] = cache.hits
+            counts[(name, 'miss')] = cache.misses
+    return counts
+
+# Metrics served at /metrics. Each process reports its own values.
+metrics = Registry()
+REQUEST_SECONDS = metrics.histogram(
+    'greenthumb_request_duration_seconds', 'Request latency by endpoint.', ['endpoint', 'method'])
+REQUESTS = metrics.counter(
+    'greenthumb_requests', 'Requests by endpoint and response status.', ['endpoint', 'method', 'status'])
+REQUEST_SQL_STATEMENTS = metrics.histogram(
+    'greenthumb_request_sql_statements', 'SQL statements run per request.', ['endpoint'],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 250))
+REQUEST_SQL_SECONDS = metrics.histogram(
+    'greenthumb_request_sql_seconds', 'Time spent running SQL per request.', ['endpoint'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+SQL_STATEMENTS = metrics.counter('greenthumb_sql_statements', 'SQL statements run, in or outside requests.')
+SQL_SECONDS = metrics.counter('greenthumb_sql_seconds', 'Time spent running SQL, in or outside requests.')
+POOL_CHECKOUT_SECONDS = metrics.histogram(
+    'greenthumb_db_pool_checkout_seconds', 'Time waiting for a connection from the database pool.',
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0))
+REMINDER_RUN_SECONDS = metrics.histogram(
+    'greenthumb_reminder_run_seconds', 'Duration of each reminder check.',
+    buckets=(0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0))
+REMINDER_PLANTS_SCANNED = metrics.counter('greenthumb_reminder_plants_scanned', 'Due plants read by reminder checks.')
+SMTP_SEND_SECONDS = metrics.histogram(
+    'greenthumb_smtp_send_seconds', 'SMTP send latency per message.', ['kind'])
+SMTP_SEND_FAILURES = metrics.counter(
+    'greenthumb_smtp_send_failures', 'Messages the SMTP server did not accept.', ['kind'])
+CACHE_LOOKUPS = metrics.counter_function(
+    'greenthumb_cache_lookups', 'Per-worker cache lookups by cache and result.', ['cache', 'result'],
+    cache_lookup_counts)
+
+MAX_WATER_FREQUENCY_DAYS = 365
+
+def compute_next_due(last_watered, water_frequency):
+    """Return the date a plant is next due for water, or None if unknown"""
+    if not last_watered:
+        return None
+    try:
+        return last_watered + timedelta(days=int(water_frequency))
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+def parse_water_frequency(value):
+    """Watering interval in days from form or file input; raises ValueError"""
+    try:
+        water_frequency = int(str(value).strip())
+    except ValueError:
+        raise ValueError('water_frequency must be a whole number of days') from None
+    if not 1 <= water_frequency <= MAX_WATER_FREQUENCY_DAYS:
+        raise ValueError(f'water_frequency must be between 1 and {MAX_WATER_FREQUENCY_DAYS} days')
+    return water_frequency
+
+# Schema upgrades for databases created before a column or index existed.
+# db.create_all() only creates missing tables, so new columns are added here.
+def upgrade_database():
+    inspector = db.inspect(db.engine)
+
+    with db.engine.begin() as connection:
+        preparer = connection.dialect.identifier_preparer
+        for table in db.metadata.sorted_tables:
+            existing_columns = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing_columns:
+                    ddl = (f'ALTER TABLE {preparer.format_table(table)} '
+                           f'ADD COLUMN {preparer.format_column(column)} {column.type.compile(connection.dialect)}')
+                    if column.server_default is not None:
+                        ddl += f" DEFAULT '{column.server_default.arg}'"
+                        if not column.nullable:
+                            ddl += ' NOT NULL'
+                    connection.execute(db.text(ddl))
+                    print(f"✅ Added {table.name}.{column.name} column")
+
+        last_watered_column = next(column for column in inspector.get_columns('plant')
+                                   if column['name'] == 'last_watered')
+        if not isinstance(last_watered_column['type'], db.Date):
+            convert_last_watered_to_date(connection)
+
+        normalize_reminder_times(connection)
+
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+    backfill_next_due()
+
+def convert_last_watered_to_date(connection, batch_size=1000):
+    """Turn plant.last_watered from a YYYY-MM-DD string into a DATE column.
+
+    Values that do not parse are cleared, along with their next_due, so the
+    plant shows as "unknown" until it is next watered.
+    """
+    last_id = 0
+    cleared = 0
+    while True:
+        rows = connection.execute(db.text(
+            'SELECT id, last_watered FROM plant WHERE id > :last_id AND last_watered IS NOT NULL '
+            'ORDER BY id LIMIT :limit'
+        ), {'last_id': last_id, 'limit': batch_size}).all()
+        if not rows:
+            break
+
+        normalized = []
+        unparseable = []
+        for plant_id, last_watered in rows:
+            try:
+                value = datetime.strptime(str(last_watered).strip(), '%Y-%m-%d').date().isoformat()
+                if value != last_watered:
+                    normalized.append({'id': plant_id, 'last_watered': value})
+            except ValueError:
+                unparseable.append({'id': plant_id})
+        if normalized:
+            connection.execute(db.text('UPDATE plant SET last_watered = :last_watered WHERE id = :id'), normalized)
+        if unparseable:
+            connection.execute(db.text(
+                'UPDATE plant SET last_watered = NULL, next_due = NULL WHERE id = :id'
+            ), unparseable)
+            cleared += len(unparseable)
+
+        last_id = rows[-1][0]
+
+    if connection.dialect.name == 'postgresql':
+        connection.execute(db.text(
+            'ALTER TABLE plant ALTER COLUMN last_watered TYPE DATE USING last_watered::date'
+        ))
+    elif connection.dialect.name == 'sqlite':
+        # SQLite cannot change a column type in place, so rebuild the table
+        plant_table = Plant.__table__
+        columns = ', '.join(connection.dialect.identifier_preparer.format_column(column)
+                            for column in plant_table.columns)
+        metadata = db.MetaData()
+        User.__table__.to_metadata(metadata)
+        new_table = plant_table.to_metadata(metadata, name='plant_new')
+        connection.execute(db.schema.CreateTable(new_table))
+        connection.execute(db.text(f'INSERT INTO plant_new ({columns}) SELECT {columns} FROM plant'))
+        connection.execute(db.text('DROP TABLE plant'))
+        connection.execute(db.text('ALTER TABLE plant_new RENAME TO plant'))
+    else:
+        print(f"⚠️  Cannot change plant.last_watered type on {connection.dialect.name}; values were cleaned only")
+
+    print(f"✅ Converted plant.last_watered to DATE ({cleared} unparseable values cleared)")
+
+def normalize_reminder_times(connection):
+    """Store every user.reminder_time as zero-padded HH:MM.
+
+    The reminder dispatcher compares reminder times as strings, so legacy
+    values such as '8:05' would never match a slot. Missing or unparseable
+    values get the default of 08:00.
+    """
+    user_table = connection.dialect.identifier_preparer.format_table(User.__table__)
+    normalized = []
+    for user_id, reminder_time in connection.execute(db.text(f'SELECT id, reminder_time FROM {user_table}')):
+        try:
+            value = datetime.strptime(str(reminder_time).strip(), '%H:%M').strftime('%H:%M')
+        except ValueError:
+            value = '08:00'
+        if value != reminder_time:
+            normalized.append({'id': user_id, 'reminder_time': value})
+    if normalized:
+        connection.execute(db.text(f'UPDATE {user_table} SET reminder_time = :reminder_time WHERE id = :id'),
+                           normalized)
+        print(f"✅ Normalized {len(normalized)} user.reminder_time values to HH:MM")
+
+def backfill_next_due(batch_size=1000):
+    """Fill next_due for plants stored before the column existed"""
+    last_id = 0
+    updated = 0
+    while True:
+        rows = db.session.query(Plant.id, Plant.last_watered, Plant.water_frequency) \
+            .filter(Plant.id > last_id, Plant.next_due.is_(None), Plant.last_watered.isnot(None)) \
+            .order_by(Plant.id) \
+            .limit(batch_size) \
+            .all()
+        if not rows:
+            break
+
+        mappings = []
+        for plant_id, last_watered, water_frequency in rows:
+            next_due = compute_next_due(last_watered, water_frequency)
+            if next_due:
+                mappings.append({'id': plant_id, 'next_due': next_due})
+        if mappings:
+            db.session.bulk_update_mappings(Plant, mappings)
+            db.session.commit()
+            updated += len(mappings)
+
+        last_id = rows[-1].id
+
+    if updated:
+        print(f"✅ Backfilled next_due for {updated} plants")
+
+# Tables are created and upgraded by this explicit step (run on deploy, before
+# the web workers start) rather than whenever the module is imported
+@bp.cli.command('upgrade-db')
+def upgrade_db_command():
+    """Create missing tables and apply schema upgrades"""
     db.create_all()
+    upgrade_database()
     print("✅ Database tables created successfully!")
 
+class HashingBusy(Exception):
+    """Raised when too many password hashes are already queued"""
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool instead of the request thread.
+
+    At most BCRYPT_WORKERS hashes run at once and BCRYPT_MAX_PENDING more may
+    wait; beyond that HashingBusy is raised so the request can fail fast
+    rather than tie up the worker. The pool is created on first use.
+    """
+
+    def __init__(self):
+        self._executor = None
+        self._slots = None
+        self._lock = threading.Lock()
+
+    def _submit(self, func, *args):
+        with self._lock:
+            if self._executor is None:
+                workers = current_app.config['BCRYPT_WORKERS'] or os.cpu_count() or 1
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+                self._slots = threading.BoundedSemaphore(workers + current_app.config['BCRYPT_MAX_PENDING'])
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+        try:
+            future = self._executor.submit(func, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _future: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        return self._submit(bcrypt.generate_password_hash, password).decode('utf-8')
+
+    def check(self, password_hash, password):
+        return self._submit(bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True if the hash was made with a different cost than configured"""
+        try:
+            return int(password_hash.split('$')[2]) != current_app.config['BCRYPT_LOG_ROUNDS']
+        except (IndexError, ValueError):
+            return True
+
+password_hasher = PasswordHasher()
+
+def busy_response(template, **context):
+    flash('The server is busy right now. Please try again in a moment.', 'warning')
+    return render_template(template, **context), 503
+
 # User loader function
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Cached users are detached snapshots; merge(load=False) gives this
+    # request its own session copy without querying the database.
+    # plants_version is left out, as another worker may bump it at any time:
+    # read it with get_plants_version() when building a cache key.
+    user_id = int(user_id)
+    user_cache = current_app.extensions['user_cache']
+    cached_user = user_cache.get(user_id)
+    if cached_user is not None:
+        return db.session.merge(cached_user, load=False)
+    
+    user = User.query.get(user_id)
+    if user is not None:
+        snapshot = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns
+                           if column.key != 'plants_version'})
+        make_transient_to_detached(snapshot)
+        user_cache.set(user_id, snapshot)
+    return user
+
+# Callers that change a user row drop it here so the next request reloads it.
+# Other workers may serve their copy for up to USER_CACHE_TTL seconds.
+def invalidate_user_cache(user_id):
+    current_app.extensions['user_cache'].pop(user_id)
+
+# Rendered HTML kept per worker: whole pages for routes that look the same for
+# every user, and fragments of per-user pages whose cache key says when they
+# go stale. Both are off when RENDER_CACHE_ENABLED is false.
+def template_mtime(name):
+    return os.path.getmtime(os.path.join(current_app.root_path, current_app.template_folder, name))
+
+def cached_page(*templates):
+    """Cache a view's rendered HTML until one of `templates` changes on disk.
+
+    The only per-user part allowed in the page is the navigation bar, so the
+    cache key includes the logged-in email. Pages with pending flash messages
+    are rendered fresh. Responses carry an ETag and Last-Modified, and
+    unchanged pages are answered with 304 Not Modified.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config['RENDER_CACHE_ENABLED'] or session.get('_flashes'):
+                return view(*args, **kwargs)
+            mtimes = tuple(template_mtime(name) for name in templates)
+            viewer = current_user.email if current_user.is_authenticated else None
+            key = (request.path, viewer, mtimes)
+            page_cache = current_app.extensions['page_cache']
+            entry = page_cache.get(key)
+            if entry is None:
+                html = view(*args, **kwargs)
+                entry = (html, hashlib.sha1(html.encode()).hexdigest())
+                page_cache.set(key, entry)
+
+            html, etag = entry
+            response = current_app.response_class(html, mimetype='text/html')
+            response.set_etag(etag)
+            response.last_modified = datetime.fromtimestamp(int(max(mtimes)), timezone.utc)
+            # Browsers keep the page but check back each time, getting a 304
+            # until the templates or the logged-in user change
+            response.cache_control.private = True
+            response.cache_control.no_cache = True
+            response.vary.add('Cookie')
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
+
+@bp.app_template_global()
+def cache_fragment(*key, caller):
+    """Template helper caching the HTML of a `{% call cache_fragment(...) %}`
+    block under `key`, which must change whenever the block's output would.
+    Keys for a user's data start with (name, user_id) so that
+    invalidate_fragments() can drop them."""
+    if not current_app.config['RENDER_CACHE_ENABLED']:
+        return caller()
+    fragment_cache = current_app.extensions['fragment_cache']
+    html = fragment_cache.get(key)
+    if html is None:
+        html = caller()
+        fragment_cache.set(key, html)
+    return html
+
+def invalidate_fragments(user_id):
+    """Drop this worker's cached fragments for a user. Keys that include
+    plants_version already go stale in every worker when plants change;
+    this frees the memory straight away."""
+    current_app.extensions['fragment_cache'].discard(lambda key: len(key) > 1 and key[1] == user_id)
 
 # Routes for user authentication
-@app.route('/register', methods=['GET', 'POST'])
+@bp.route('/register', methods=['GET', 'POST'])
 def register():
     if request.method == 'POST':
         email = request.form['email']
@@ -86,9 +567,12 @@ def register():
         existing_user = User.query.filter_by(email=email).first()
         if existing_user:
             flash('Email already registered. Please login.', 'danger')
-            return redirect(url_for('login'))
+            return redirect(url_for('main.login'))
         
-        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+        try:
+            hashed_password = password_hasher.hash(password)
+        except HashingBusy:
+            return busy_response('register.html')
         user = User(email=email, password=hashed_password, phone=phone, reminder_time='08:00')
         
         db.session.add(user)
@@ -98,11 +582,11 @@ def register():
         send_welcome_email(user)
         
         flash('Account created successfully! Please login.', 'success')
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
     
     return render_template('register.html')
 
-@app.route('/login', methods=['GET', 'POST'])
+@bp.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
         email = request.form['email']
@@ -110,42 +594,62 @@ def login():
         remember = True if request.form.get('remember') else False
         
         user = User.query.filter_by(email=email).first()
-        if user and bcrypt.check_password_hash(user.password, password):
+        try:
+            valid = user is not None and password_hasher.check(user.password, password)
+            # Upgrade hashes made with an old work factor while we have the password
+            if valid and password_hasher.needs_rehash(user.password):
+                user.password = password_hasher.hash(password)
+                db.session.commit()
+                invalidate_user_cache(user.id)
+        except HashingBusy:
+            return busy_response('login.html')
+        
+        if valid:
             login_user(user, remember=remember)
             flash('Logged in successfully!', 'success')
-            return redirect(url_for('index'))
+            return redirect(url_for('main.index'))
         else:
             flash('Login failed. Please check your email and password.', 'danger')
     
     return render_template('login.html')
 
-@app.route('/forgot-password', methods=['GET', 'POST'])
+@bp.route('/forgot-password', methods=['GET', 'POST'])
 def forgot_password():
     if request.method == 'POST':
         email = request.form['email']
         user = User.query.filter_by(email=email).first()
         
         if user:
-            # Generate reset token
+            # A new link replaces any the user asked for before
             token = secrets.token_urlsafe(32)
-            user.reset_token = token
+            now = datetime.utcnow()
+            PasswordResetToken.query.filter_by(user_id=user.id).delete(synchronize_session=False)
+            db.session.add(PasswordResetToken(
+                token_hash=hash_reset_token(token), user_id=user.id, created_at=now,
+                expires_at=now + timedelta(minutes=current_app.config['PASSWORD_RESET_TOKEN_MINUTES']),
+            ))
             db.session.commit()
             
             # Send reset email
             send_password_reset_email(user, token)
             
         flash('If an account with that email exists, a password reset link has been sent.', 'info')
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
     
     return render_template('forgot_password.html')
 
-@app.route('/reset-password/<token>', methods=['GET', 'POST'])
+@bp.route('/reset-password/<token>', methods=['GET', 'POST'])
 def reset_password(token):
-    user = User.query.filter_by(reset_token=token).first()
+    # Unique index lookup on the token's hash
+    reset_token = PasswordResetToken.query.filter(
+        PasswordResetToken.token_hash == hash_reset_token(token),
+        PasswordResetToken.expires_at > datetime.utcnow(),
+    ).first()
+    user = User.query.get(reset_token.user_id) if reset_token else None
     
     if not user:
         flash('Invalid or expired reset token.', 'danger')
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
     
     if request.method == 'POST':
         password = request.form['password']
@@ -155,352 +659,1624 @@ def reset_password(token):
             flash('Passwords do not match.', 'danger')
             return render_template('reset_password.html', token=token)
         
-        user.password = bcrypt.generate_password_hash(password).decode('utf-8')
-        user.reset_token = None
+        try:
+            user.password = password_hasher.hash(password)
+        except HashingBusy:
+            return busy_response('reset_password.html', token=token)
+        PasswordResetToken.query.filter_by(user_id=user.id).delete(synchronize_session=False)
         db.session.commit()
+        invalidate_user_cache(user.id)
         
         flash('Your password has been reset successfully. Please login.', 'success')
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
     
     return render_template('reset_password.html', token=token)
 
-@app.route('/logout')
+@bp.route('/logout')
 @login_required
 def logout():
+    invalidate_user_cache(current_user.id)
     logout_user()
     flash('You have been logged out.', 'info')
-    return redirect(url_for('login'))
+    return redirect(url_for('main.login'))
 
 # Settings page for personalized reminder time
-@app.route('/settings', methods=['GET', 'POST'])
+@bp.route('/settings', methods=['GET', 'POST'])
 @login_required
 def settings():
     if request.method == 'POST':
         reminder_time = request.form['reminder_time']
         
+        timezone_name = request.form.get('timezone') or current_app.config['DEFAULT_TIMEZONE']
+        
         # Validate time format (HH:MM)
         try:
-            datetime.strptime(reminder_time, '%H:%M')
-            current_user.reminder_time = reminder_time
-            db.session.commit()
-            
-            # Reschedule reminders with new time
-            schedule_watering_reminders()
-            
-            flash('Reminder time updated successfully!', 'success')
+            # Stored zero-padded so the dispatcher can compare slots as strings
+            current_user.reminder_time = datetime.strptime(reminder_time, '%H:%M').strftime('%H:%M')
         except ValueError:
             flash('Please enter a valid time format (HH:MM).', 'danger')
+            return redirect(url_for('main.settings'))
         
-        return redirect(url_for('settings'))
+        if timezone_name not in get_timezones():
+            flash('Please choose a valid timezone.', 'danger')
+            return redirect(url_for('main.settings'))
+        
+        # The reminder dispatcher reads the new time on its next run,
+        # so no jobs need to be rescheduled here
+        current_user.timezone = timezone_name
+        db.session.commit()
+        invalidate_user_cache(current_user.id)
+        
+        flash('Reminder time updated successfully!', 'success')
+        return redirect(url_for('main.settings'))
     
-    return render_template('settings.html')
+    return render_template('settings.html',
+                         timezones=get_timezones(),
+                         current_timezone=current_user.timezone or current_app.config['DEFAULT_TIMEZONE'])
+
+@lru_cache(maxsize=1)
+def get_timezones():
+    return sorted(available_timezones() | {'UTC'})
+
+def local_today(timezone_name, now=None):
+    """The date at `now` (default: the current time) in a timezone, or in
+    DEFAULT_TIMEZONE if timezone_name is unset or unknown"""
+    now = now or datetime.now(timezone.utc)
+    try:
+        zone = ZoneInfo(timezone_name or current_app.config['DEFAULT_TIMEZONE'])
+    except (ZoneInfoNotFoundError, ValueError):
+        zone = ZoneInfo(current_app.config['DEFAULT_TIMEZONE'])
+    return now.astimezone(zone).date()
 
 # Main application routes
-@app.route('/')
+@bp.route('/')
 @login_required
 def index():
-    plants = Plant.query.filter_by(user_id=current_user.id).order_by(Plant.name).all()
+    today = local_today(current_user.timezone)
+    per_page = current_app.config['DASHBOARD_PAGE_SIZE']
     
-    # Check for plants that need watering today
-    today = datetime.now().date()
-    plants_needing_water = []
-    plant_data = []
+    # Watering status is bucketed by the database, and plants are shown a
+    # page at a time in (name, id) order using the (user_id, name) index
+    plants = db.session.query(Plant, watering_status_expression(today)) \
+        .filter(Plant.user_id == current_user.id)
+    after_name = request.args.get('after_name')
+    after_id = request.args.get('after_id', type=int)
+    if after_name is not None and after_id is not None:
+        plants = plants.filter(db.or_(
+            Plant.name > after_name,
+            db.and_(Plant.name == after_name, Plant.id > after_id),
+        ))
+    plants = plants.order_by(Plant.name, Plant.id).limit(per_page + 1).all()
     
-    for plant in plants:
-        plant_info = {
+    plant_data = []
+    for plant, watering_status in plants[:per_page]:
+        plant_data.append({
             'plant': plant,
-            'days_until_watering': None,
-            'watering_status': 'unknown'
-        }
-        
-        if plant.last_watered:
-            try:
-                last_watered_date = datetime.strptime(plant.last_watered, '%Y-%m-%d').date()
-                next_watering_date = last_watered_date + timedelta(days=plant.water_frequency)
-                days_until = (next_watering_date - today).days
-                
-                plant_info['days_until_watering'] = days_until
-                
-                # Determine watering status
-                if days_until <= 0:
-                    plant_info['watering_status'] = 'today'
-                    plants_needing_water.append(plant)
-                elif days_until == 1:
-                    plant_info['watering_status'] = 'tomorrow'
-                else:
-                    plant_info['watering_status'] = 'future'
-                    
-            except ValueError:
-                plant_info['watering_status'] = 'error'
-                continue
-        
-        plant_data.append(plant_info)
+            'days_until_watering': (plant.next_due - today).days if plant.next_due else None,
+            'watering_status': watering_status
+        })
+    
+    next_page = None
+    if len(plants) > per_page:
+        last_plant = plants[per_page - 1][0]
+        next_page = {'after_name': last_plant.name, 'after_id': last_plant.id}
     
+    plants_version = get_plants_version(current_user.id)
+    summary = get_plant_summary(current_user.id, plants_version, today)
+    # The plant cards only change with the user's plants, the day and the page
+    cards_key = ('plant_cards', current_user.id, plants_version, today, after_name, after_id)
     return render_template('index.html', 
                          plant_data=plant_data, 
-                         plants_needing_water=plants_needing_water)
+                         plants_needing_water=summary['due_preview'],
+                         summary=summary,
+                         next_page=next_page,
+                         cards_key=cards_key)
+
+def watering_status_expression(today):
+    """SQL CASE that buckets a plant into unknown, today, tomorrow or future"""
+    return db.case(
+        (Plant.next_due.is_(None), 'unknown'),
+        (Plant.next_due <= today, 'today'),
+        (Plant.next_due == today + timedelta(days=1), 'tomorrow'),
+        else_='future',
+    ).label('watering_status')
+
+def get_plant_summary(user_id, plants_version, today):
+    """Per-user bucket counts, due plants and next due plant, cached.
+
+    The cache key includes plants_version, which add, delete and water bump,
+    so a change anywhere invalidates the summary for every worker.
+    """
+    key = (user_id, plants_version, today)
+    plant_summary_cache = current_app.extensions['plant_summary_cache']
+    summary = plant_summary_cache.get(key)
+    if summary is None:
+        summary = build_plant_summary(user_id, today)
+        plant_summary_cache.set(key, summary)
+    return summary
+
+def build_plant_summary(user_id, today):
+    status = watering_status_expression(today)
+    counts = dict(db.session.query(status, db.func.count(Plant.id))
+                  .filter(Plant.user_id == user_id)
+                  .group_by(status)
+                  .all())
+
+    due_preview = db.session.query(Plant.name, Plant.last_watered) \
+        .filter(Plant.user_id == user_id, Plant.next_due <= today) \
+        .order_by(Plant.next_due, Plant.id) \
+        .limit(current_app.config['DASHBOARD_DUE_PREVIEW']) \
+        .all()
+    next_due_plant = db.session.query(Plant.name, Plant.next_due) \
+        .filter(Plant.user_id == user_id, Plant.next_due > today) \
+        .order_by(Plant.next_due, Plant.id) \
+        .first()
+
+    return {
+        'counts': {bucket: counts.get(bucket, 0) for bucket in ('today', 'tomorrow', 'future', 'unknown')},
+        'total': sum(counts.values()),
+        'due_preview': [{'name': name, 'last_watered': last_watered} for name, last_watered in due_preview],
+        'next_due_plant': {'name': next_due_plant.name, 'next_due': next_due_plant.next_due} if next_due_plant else None,
+    }
+
+def watering_status_filter(status, today):
+    """Index-friendly next_due condition matching a watering status bucket"""
+    tomorrow = today + timedelta(days=1)
+    return {
+        'today': Plant.next_due <= today,
+        'tomorrow': Plant.next_due == tomorrow,
+        'future': Plant.next_due > tomorrow,
+        'unknown': Plant.next_due.is_(None),
+    }[status]
+
+def bump_plants_version(user_id):
+    """Invalidate cached plant summaries; commits with the caller's change"""
+    User.query.filter_by(id=user_id).update(
+        {User.plants_version: User.plants_version + 1}, synchronize_session=False
+    )
+    invalidate_fragments(user_id)
 
-@app.route('/add', methods=['GET', 'POST'])
+def get_plants_version(user_id):
+    """The user's current plants_version, read from the database rather than
+    the cached user so that keys built from it are never stale"""
+    return db.session.query(User.plants_version).filter_by(id=user_id).scalar()
+
+# JSON API for clients that sync a user's collection incrementally
+API_SORT_COLUMNS = {'name': Plant.name, 'next_due': Plant.next_due, 'id': Plant.id}
+
+@bp.route('/api/plants')
+@login_required
+def api_plants():
+    today = local_today(current_user.timezone)
+    
+    # The ETag only depends on the user's change counter, the day and the
+    # query, so an unchanged collection is answered without touching plants
+    etag = hashlib.sha1(
+        f'{current_user.id}:{get_plants_version(current_user.id)}:{today}:{request.query_string.decode()}'.encode()
+    ).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+    
+    sort = request.args.get('sort', 'name')
+    status = request.args.get('status')
+    if sort not in API_SORT_COLUMNS or (status and status not in ('today', 'tomorrow', 'future', 'unknown')):
+        abort(400)
+    limit = request.args.get('limit', current_app.config['API_PAGE_SIZE'], type=int)
+    limit = max(1, min(limit, current_app.config['API_MAX_PAGE_SIZE']))
+    
+    plants = db.session.query(Plant, watering_status_expression(today)).filter(Plant.user_id == current_user.id)
+    if status:
+        plants = plants.filter(watering_status_filter(status, today))
+    if request.args.get('plant_type'):
+        plants = plants.filter(Plant.plant_type == request.args['plant_type'])
+    
+    sort_column = API_SORT_COLUMNS[sort]
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            after_value, after_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            plants = plants.filter(api_keyset_filter(sort, sort_column, after_value, after_id))
+        except (ValueError, TypeError):
+            abort(400)
+    
+    if sort == 'id':
+        plants = plants.order_by(Plant.id)
+    else:
+        plants = plants.order_by(sort_column.asc().nulls_last(), Plant.id)
+    plants = plants.limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(plants) > limit:
+        last_plant = plants[limit - 1][0]
+        last_value = getattr(last_plant, sort)
+        if isinstance(last_value, date_type):
+            last_value = last_value.isoformat()
+        next_cursor = base64.urlsafe_b64encode(json.dumps([last_value, last_plant.id]).encode()).decode()
+    
+    response = jsonify({
+        'plants': [plant_to_dict(plant, watering_status) for plant, watering_status in plants[:limit]],
+        'next_cursor': next_cursor,
+    })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def api_keyset_filter(sort, sort_column, after_value, after_id):
+    """Rows after the cursor position in (sort column NULLS LAST, id) order.
+
+    Cursors come from the client, so values of the wrong type (anything but
+    integer ids and a string or null name or next_due) raise ValueError.
+    """
+    value_types = (int,) if sort == 'id' else (str, type(None))
+    for value, types in ((after_id, int), (after_value, value_types)):
+        if not isinstance(value, types) or isinstance(value, bool):
+            raise ValueError('cursor has a value of the wrong type')
+    if sort == 'id':
+        return Plant.id > after_id
+    if sort == 'next_due' and after_value is not None:
+        after_value = date_type.fromisoformat(after_value)
+    if after_value is None:
+        return db.and_(sort_column.is_(None), Plant.id > after_id)
+    return db.or_(
+        sort_column > after_value,
+        db.and_(sort_column == after_value, Plant.id > after_id),
+        sort_column.is_(None),
+    )
+
+def plant_to_dict(plant, watering_status):
+    return {
+        'id': plant.id,
+        'name': plant.name,
+        'plant_type': plant.plant_type,
+        'last_watered': plant.last_watered.isoformat() if plant.last_watered else None,
+        'water_frequency': plant.water_frequency,
+        'next_due': plant.next_due.isoformat() if plant.next_due else None,
+        'watering_status': watering_status,
+    }
+
+@bp.route('/add', methods=['GET', 'POST'])
 @login_required
 def add_plant():
     if request.method == 'POST':
         name = request.form['name']
         plant_type = request.form['plant_type']
-        last_watered = request.form['last_watered']
-        water_frequency = request.form['water_frequency']
-
-        new_plant = Plant(
-            name=name,
-            plant_type=plant_type,
-            last_watered=last_watered,
-            water_frequency=water_frequency,
-            user_id=current_user.id
-        )
+        
+        try:
+            water_frequency = parse_water_frequency(request.form['water_frequency'])
+        except ValueError:
+            flash(f'Please water every 1 to {MAX_WATER_FREQUENCY_DAYS} days.', 'danger')
+            return render_template('add_plant.html')
+        
+        try:
+            last_watered = datetime.strptime(request.form['last_watered'], '%Y-%m-%d').date()
+        except ValueError:
+            flash('Please enter a valid last watered date.', 'danger')
+            return render_template('add_plant.html')
 
-        db.session.add(new_plant)
-        db.session.commit()
+        run_write(insert_plant, current_user.id, name, plant_type, last_watered, water_frequency)
         
         flash(f'Plant "{name}" has been added successfully!', 'success')
-        return redirect(url_for('index'))
+        return redirect(url_for('main.index'))
 
     return render_template('add_plant.html')
 
-@app.route('/delete/<int:plant_id>', methods=['POST'])
+def insert_plant(user_id, name, plant_type, last_watered, water_frequency):
+    """Add a plant; callers commit, usually through run_write()"""
+    db.session.add(Plant(
+        name=name,
+        plant_type=plant_type,
+        last_watered=last_watered,
+        water_frequency=water_frequency,
+        next_due=compute_next_due(last_watered, water_frequency),
+        user_id=user_id
+    ))
+    bump_plants_version(user_id)
+
+@bp.route('/delete/<int:plant_id>', methods=['POST'])
 @login_required
 def delete_plant(plant_id):
     # Ensure user can only delete their own plants
     plant = Plant.query.filter_by(id=plant_id, user_id=current_user.id).first_or_404()
     plant_name = plant.name
     
+    WateringEvent.query.filter_by(plant_id=plant.id).delete(synchronize_session=False)
+    ReminderSent.query.filter_by(plant_id=plant.id).delete(synchronize_session=False)
     db.session.delete(plant)
+    bump_plants_version(current_user.id)
     db.session.commit()
     
     flash(f'Plant "{plant_name}" has been deleted.', 'danger')
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
 
-@app.route('/water/<int:plant_id>', methods=['POST'])
+@bp.route('/water/<int:plant_id>', methods=['POST'])
 @login_required
 def water_plant(plant_id):
     plant = Plant.query.filter_by(id=plant_id, user_id=current_user.id).first_or_404()
-    plant.last_watered = datetime.now().strftime('%Y-%m-%d')
-    db.session.commit()
+    run_write(water_plants, current_user.id, local_today(current_user.timezone), plant_ids=[plant.id])
     
     flash(f'{plant.name} has been watered!', 'success')
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
+
+# Water several plants at once: the selected plant_ids, or every due plant
+@bp.route('/water', methods=['POST'])
+@login_required
+def water_many():
+    today = local_today(current_user.timezone)
+    if request.form.get('all_due'):
+        watered = run_write(water_plants, current_user.id, today, due_only=True)
+    else:
+        plant_ids = request.form.getlist('plant_ids', type=int)
+        watered = run_write(water_plants, current_user.id, today, plant_ids=plant_ids) if plant_ids else 0
+    
+    if watered:
+        flash(f'{watered} plants have been watered!', 'success')
+    else:
+        flash('No plants needed watering.', 'info')
+    return redirect(url_for('main.index'))
+
+def water_plants(user_id, today, plant_ids=None, due_only=False):
+    """Mark a user's plants as watered on `today`, the user's local date;
+    callers commit, usually through run_write().
+
+    The plants are updated with one bulk UPDATE, and one bulk INSERT adds a
+    watering event for each. Returns the number of plants watered.
+    """
+    plants = db.session.query(Plant.id, Plant.water_frequency).filter(Plant.user_id == user_id)
+    if plant_ids is not None:
+        plants = plants.filter(Plant.id.in_(plant_ids))
+    if due_only:
+        plants = plants.filter(Plant.next_due <= today)
+    plants = plants.all()
+    if not plants:
+        return 0
+
+    db.session.bulk_update_mappings(Plant, [
+        {'id': plant_id, 'last_watered': today, 'next_due': compute_next_due(today, water_frequency)}
+        for plant_id, water_frequency in plants
+    ])
+    db.session.bulk_insert_mappings(WateringEvent, [
+        {'plant_id': plant_id, 'user_id': user_id, 'watered_on': today}
+        for plant_id, _water_frequency in plants
+    ])
+    bump_plants_version(user_id)
+    return len(plants)
+
+def run_write(func, *args, **kwargs):
+    """Run func(*args, **kwargs) and commit, returning its result.
+
+    With WRITE_QUEUE_ENABLED the call is handed to the process's writer
+    thread instead, which may commit it together with other queued writes.
+    func must take plain values rather than objects from the caller's session.
+    """
+    write_queue = current_app.extensions.get('write_queue')
+    if write_queue is not None:
+        return write_queue.submit(func, *args, **kwargs)
+    result = func(*args, **kwargs)
+    db.session.commit()
+    return result
+
+class WriteQueue:
+    """One writer thread per process for small writes.
+
+    Each round takes everything queued, up to WRITE_QUEUE_MAX_BATCH calls,
+    runs them in one transaction and commits once, so concurrent requests
+    share a commit instead of queueing on SQLite's write lock. If that
+    commit fails, each call is retried in a transaction of its own so one
+    bad write does not fail the others.
+
+    Callers wait up to WRITE_QUEUE_TIMEOUT_SECONDS and then get a
+    TimeoutError; the write stays queued and may still commit.
+    """
+
+    def __init__(self, app):
+        self._app = app
+        self._queue = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, func, *args, **kwargs):
+        """Queue a write and wait for it to commit, returning its result"""
+        future = Future()
+        self._queue.put((func, args, kwargs, future))
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+                self._thread.start()
+        return future.result(timeout=self._app.config['WRITE_QUEUE_TIMEOUT_SECONDS'])
+
+    def _run(self):
+        max_batch = self._app.config['WRITE_QUEUE_MAX_BATCH']
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self._app.app_context():
+                    self._write(batch)
+            except Exception as e:
+                # A failed rollback or app context must not leave callers waiting
+                print(f"Write queue round failed: {e}")
+                for _func, _args, _kwargs, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _write(self, batch):
+        try:
+            results = [func(*args, **kwargs) for func, args, kwargs, _future in batch]
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            if len(batch) == 1:
+                batch[0][3].set_exception(e)
+            else:
+                for write in batch:
+                    self._write([write])
+            return
+        for (_func, _args, _kwargs, future), result in zip(batch, results):
+            future.set_result(result)
+
+@bp.route('/plant/<int:plant_id>/history')
+@login_required
+def plant_history(plant_id):
+    plant = Plant.query.filter_by(id=plant_id, user_id=current_user.id).first_or_404()
+    per_page = current_app.config['HISTORY_PAGE_SIZE']
+    
+    # Keyset pagination: each page starts below the last event id already shown
+    events = WateringEvent.query.filter_by(plant_id=plant.id)
+    before = request.args.get('before', type=int)
+    if before:
+        events = events.filter(WateringEvent.id < before)
+    events = events.order_by(WateringEvent.id.desc()).limit(per_page + 1).all()
+    
+    next_before = events[per_page - 1].id if len(events) > per_page else None
+    return render_template('plant_history.html',
+                         plant=plant,
+                         events=events[:per_page],
+                         next_before=next_before)
 
-@app.route('/plant-info')
+@bp.route('/plant-info')
 @login_required
+@cached_page('plant_info.html', 'base.html')
 def plant_info():
     return render_template('plant_info.html')
 
+# Bulk import and export of a user's plants, with the same columns both ways
+PLANT_FILE_COLUMNS = ('name', 'plant_type', 'water_frequency', 'last_watered')
+# Longest JSON value the import will buffer while looking for its end
+MAX_JSON_ROW_CHARS = 64 * 1024
+
+@bp.route('/import', methods=['GET', 'POST'])
+@login_required
+def import_plants():
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Please choose a CSV or JSON file to import.', 'danger')
+            return render_template('import_plants.html')
+        
+        # Read the upload as it is parsed rather than loading it first
+        text = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+        if upload.filename.lower().endswith(('.json', '.jsonl')):
+            rows = iter_json_values(text)
+        else:
+            rows = csv.DictReader(text)
+        result = import_plant_rows(current_user.id, rows)
+        
+        if result['imported']:
+            flash(f"Imported {result['imported']} plants.", 'success')
+        if result['rejected']:
+            flash(f"{result['rejected']} rows were skipped because of errors.", 'danger')
+        return render_template('import_plants.html', result=result)
+    
+    return render_template('import_plants.html')
+
+def iter_json_values(text, chunk_size=64 * 1024):
+    """Yield the values of a top-level JSON array, or of JSON Lines, one at
+    a time, reading the text in chunks"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    # 'start' until the first character; then 'lines' for JSON Lines, or
+    # for an array 'first' (after '['), 'value' (after ','), 'separator'
+    # (after a value) and 'done' (after the closing ']')
+    state = 'start'
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n':
+            position += 1
+        if position == len(buffer):
+            if eof:
+                if state in ('first', 'value', 'separator'):
+                    raise ValueError('the file ended inside the array')
+                return
+            more = text.read(chunk_size)
+            eof = not more
+            buffer, position = more, 0
+            continue
+
+        char = buffer[position]
+        if state == 'start':
+            state = 'first' if char == '[' else 'lines'
+            if state == 'first':
+                position += 1
+                continue
+        if state == 'done':
+            raise ValueError('unexpected data after the array')
+        if char == ']':
+            if state not in ('first', 'separator'):
+                raise ValueError("expected a value before ']'")
+            position += 1
+            state = 'done'
+            continue
+        if state == 'separator':
+            if char != ',':
+                raise ValueError("expected ',' or ']' after an array value")
+            position += 1
+            state = 'value'
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+            # A value ending the chunk might be a number cut short
+            complete = end < len(buffer) or eof
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            complete = False
+        if complete:
+            yield value
+            position = end
+            if state != 'lines':
+                state = 'separator'
+            continue
+        if len(buffer) - position > MAX_JSON_ROW_CHARS:
+            raise ValueError(f'a JSON value is invalid or longer than {MAX_JSON_ROW_CHARS} characters')
+        more = text.read(chunk_size)
+        eof = not more
+        buffer, position = buffer[position:] + more, 0
+
+def import_plant_rows(user_id, rows):
+    """Validate and insert imported rows for a user.
+
+    Valid rows are inserted IMPORT_CHUNK_SIZE at a time, one transaction per
+    chunk. Invalid rows are skipped and counted, with the first
+    IMPORT_MAX_ERRORS reasons kept for the user. A file that stops parsing
+    keeps the rows read before that point.
+    """
+    chunk_size = current_app.config['IMPORT_CHUNK_SIZE']
+    max_errors = current_app.config['IMPORT_MAX_ERRORS']
+    result = {'imported': 0, 'rejected': 0, 'errors': []}
+    chunk = []
+    number = 0
+    try:
+        for number, row in enumerate(rows, start=1):
+            try:
+                chunk.append(validate_plant_row(row, user_id))
+            except ValueError as e:
+                result['rejected'] += 1
+                if len(result['errors']) < max_errors:
+                    result['errors'].append(f'Row {number}: {e}')
+                continue
+            if len(chunk) >= chunk_size:
+                insert_plant_mappings(user_id, chunk)
+                result['imported'] += len(chunk)
+                chunk = []
+    except (csv.Error, ValueError) as e:
+        # Malformed CSV or JSON, or text that is not UTF-8
+        result['errors'].append(f'Stopped reading the file after row {number}: {e}')
+    if chunk:
+        insert_plant_mappings(user_id, chunk)
+        result['imported'] += len(chunk)
+    return result
+
+def validate_plant_row(row, user_id):
+    """Plant column values for one imported row; raises ValueError"""
+    if not isinstance(row, dict):
+        raise ValueError('expected an object with plant fields')
+    name = str(row.get('name') or '').strip()
+    if not name:
+        raise ValueError('name is required')
+    plant_type = str(row.get('plant_type') or '').strip() or None
+    for column, value in (('name', name), ('plant_type', plant_type)):
+        if value and len(value) > 100:
+            raise ValueError(f'{column} is longer than 100 characters')
+    
+    water_frequency = parse_water_frequency(row.get('water_frequency'))
+    
+    last_watered = str(row.get('last_watered') or '').strip() or None
+    if last_watered:
+        try:
+            last_watered = datetime.strptime(last_watered, '%Y-%m-%d').date()
+        except ValueError:
+            raise ValueError('last_watered must be a YYYY-MM-DD date') from None
+    next_due = None
+    if last_watered:
+        try:
+            next_due = last_watered + timedelta(days=water_frequency)
+        except OverflowError:
+            raise ValueError('last_watered is too late to schedule the next watering') from None
+    
+    return {
+        'name': name,
+        'plant_type': plant_type,
+        'water_frequency': water_frequency,
+        'last_watered': last_watered,
+        'next_due': next_due,
+        'user_id': user_id,
+    }
+
+def insert_plant_mappings(user_id, mappings):
+    db.session.bulk_insert_mappings(Plant, mappings)
+    bump_plants_version(user_id)
+    db.session.commit()
+
+@bp.route('/export/<file_format>')
+@login_required
+def export_plants(file_format):
+    """Download every plant as CSV or JSON, streamed as rows are read"""
+    if file_format not in ('csv', 'json'):
+        abort(404)
+    batch_size = current_app.config['EXPORT_BATCH_SIZE']
+    rows = db.session.query(*[getattr(Plant, column) for column in PLANT_FILE_COLUMNS]) \
+        .filter(Plant.user_id == current_user.id) \
+        .order_by(Plant.id) \
+        .yield_per(batch_size)
+    
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(PLANT_FILE_COLUMNS)
+        for number, row in enumerate(rows, start=1):
+            writer.writerow(row)
+            if number % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    
+    def generate_json():
+        yield '['
+        lines = []
+        separator = '\n'
+        for row in rows:
+            lines.append(separator + json.dumps(dict(zip(PLANT_FILE_COLUMNS, row)), default=date_type.isoformat))
+            separator = ',\n'
+            if len(lines) == batch_size:
+                yield ''.join(lines)
+                lines = []
+        yield ''.join(lines) + '\n]\n'
+    
+    generate = generate_csv if file_format == 'csv' else generate_json
+    response = current_app.response_class(stream_with_context(generate()),
+                                          mimetype='text/csv' if file_format == 'csv' else 'application/json')
+    response.headers['Content-Disposition'] = f'attachment; filename=greenthumb-plants.{file_format}'
+    return response
+
 # Email and notification functionality
 def send_welcome_email(user):
-    try:
-        msg = Message(
-            subject='🌿 Welcome to GreenThumb!',
-            recipients=[user.email],
-            html=f'''
-            <!DOCTYPE html>
-            <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto;">
-                <div style="background: linear-gradient(135deg, #2e7d32, #4caf50); padding: 20px; text-align: center;">
-                    <h1 style="color: white; margin: 0;">🌿 GreenThumb</h1>
-                </div>
-                <div style="padding: 20px; background: #f9f9f9;">
-                    <h2>Welcome to GreenThumb, Plant Lover!</h2>
-                    <p>We're thrilled to have you on board. With GreenThumb, you'll never forget to water your plants again.</p>
-                    <p>Here's what you can do:</p>
-                    <ul>
-                        <li>Track all your plants in one place</li>
-                        <li>Get reminders when it's time to water</li>
-                        <li>Learn about plant care techniques</li>
-                        <li>Watch your plant family grow!</li>
-                    </ul>
-                    <p>Start by adding your first plant to your collection!</p>
-                    <div style="text-align: center; margin: 30px 0;">
-                        <a href="{url_for('index', _external=True)}" style="background: #4caf50; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block;">Get Started</a>
-                    </div>
-                    <p>Happy planting! 🌱</p>
-                    <p><strong>The GreenThumb Team</strong></p>
-                </div>
-                <div style="background: #e8f5e8; padding: 15px; text-align: center; font-size: 12px; color: #666;">
-                    <p>© 2025 GreenThumb App. All rights reserved.</p>
-                </div>
-            </body>
-            </html>
-            '''
-        )
-        mail.send(msg)
-    except Exception as e:
-        print(f"Failed to send welcome email: {e}")
+    html, body = render_email('welcome', dashboard_url=url_for('main.index', _external=True))
+    queue_email(recipient=user.email, subject='🌿 Welcome to GreenThumb!', html=html, body=body)
 
 def send_password_reset_email(user, token):
+    reset_url = url_for('main.reset_password', token=token, _external=True)
+    minutes = current_app.config['PASSWORD_RESET_TOKEN_MINUTES']
+    hours = minutes // 60
+    expires_in = f"{hours} hour{'s' if hours != 1 else ''}" if minutes % 60 == 0 else f'{minutes} minutes'
+    html, body = render_email('reset_password', reset_url=reset_url, expires_in=expires_in)
+    queue_email(recipient=user.email, subject='🔒 Reset Your GreenThumb Password', html=html, body=body,
+                sensitive=True)
+
+def get_email_templates(name):
+    """Compiled HTML and plain-text templates for an email, loaded once per app"""
+    templates = current_app.extensions.setdefault('email_templates', {})
+    if name not in templates:
+        templates[name] = (current_app.jinja_env.get_template(f'email/{name}.html'),
+                           current_app.jinja_env.get_template(f'email/{name}.txt'))
+    return templates[name]
+
+def render_email(name, **context):
+    """Render an email from templates/email/, returning (html, text)"""
+    html_template, text_template = get_email_templates(name)
+    return html_template.render(**context), text_template.render(**context)
+
+def queue_email(recipient, subject, html, body=None, sensitive=False):
+    """Store an email in the outbox; the background sender delivers it.
+    Pass sensitive=True for emails holding secrets such as reset links."""
+    db.session.add(OutboxEmail(recipient=recipient, subject=subject, html=html, body=body, sensitive=sensitive))
+    db.session.commit()
+    current_app.extensions['outbox_sender'].wake()
+
+def drain_outbox():
+    """Send every due outbox email, returning how many were attempted"""
+    now = datetime.utcnow()
+    due_ids = [email_id for (email_id,) in db.session.query(OutboxEmail.id)
+               .filter(OutboxEmail.status == 'pending', OutboxEmail.next_attempt_at <= now)
+               .order_by(OutboxEmail.next_attempt_at)
+               .limit(current_app.config['OUTBOX_BATCH_SIZE'])]
+    if not due_ids:
+        return 0
+
+    # Claim the batch; the lease makes rows due again if this process dies
+    # mid-send, and the conditional update stops other workers taking them
+    token = uuid.uuid4().hex
+    OutboxEmail.query.filter(
+        OutboxEmail.id.in_(due_ids),
+        OutboxEmail.status == 'pending',
+        OutboxEmail.next_attempt_at <= now,
+    ).update({
+        OutboxEmail.claim_token: token,
+        OutboxEmail.next_attempt_at: now + timedelta(seconds=current_app.config['OUTBOX_LEASE_SECONDS']),
+    }, synchronize_session=False)
+    db.session.commit()
+
+    claimed_ids = [email_id for (email_id,) in db.session.query(OutboxEmail.id).filter_by(claim_token=token)]
+    workers = current_app.config['OUTBOX_WORKERS']
+    chunks = [claimed_ids[i::workers] for i in range(workers) if claimed_ids[i::workers]]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(partial(_send_outbox_chunk, current_app._get_current_object()), chunks))
+    return len(claimed_ids)
+
+def _send_outbox_chunk(app, email_ids):
+    from flask_mail import Message
+    with app.app_context():
+        emails = OutboxEmail.query.filter(OutboxEmail.id.in_(email_ids)).all()
+        try:
+            with get_mail().connect() as connection:
+                for email in emails:
+                    try:
+                        send_message(connection, Message(subject=email.subject, recipients=[email.recipient],
+                                                         html=email.html, body=email.body), 'outbox')
+                        email.status = 'sent'
+                        email.sent_at = datetime.utcnow()
+                        email.last_error = None
+                        email.claim_token = None
+                        _clear_sensitive_content(email)
+                    except Exception as e:
+                        _record_outbox_failure(email, e)
+                    db.session.commit()
+        except Exception as e:
+            # The SMTP connection could not be opened; retry what was not sent
+            for email in emails:
+                if email.claim_token:
+                    _record_outbox_failure(email, e)
+            db.session.commit()
+
+def send_message(connection, message, kind):
+    """connection.send() that records SMTP latency and failures by kind of email"""
+    started = time.perf_counter()
     try:
-        reset_url = url_for('reset_password', token=token, _external=True)
-        msg = Message(
-            subject='🔒 Reset Your GreenThumb Password',
-            recipients=[user.email],
-            html=f'''
-            <!DOCTYPE html>
-            <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto;">
-                <div style="background: linear-gradient(135deg, #2e7d32, #4caf50); padding: 20px; text-align: center;">
-                    <h1 style="color: white; margin: 0;">🌿 GreenThumb</h1>
-                </div>
-                <div style="padding: 20px; background: #f9f9f9;">
-                    <h2>Password Reset Request</h2>
-                    <p>We received a request to reset your password. Click the button below to create a new password:</p>
-                    <div style="text-align: center; margin: 30px 0;">
-                        <a href="{reset_url}" style="background: #4caf50; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block;">Reset Password</a>
-                    </div>
-                    <p>If you didn't request this reset, please ignore this email. Your password will remain unchanged.</p>
-                    <p><strong>Note:</strong> This link will expire in 1 hour for security reasons.</p>
-                </div>
-                <div style="background: #e8f5e8; padding: 15px; text-align: center; font-size: 12px; color: #666;">
-                    <p>© 2025 GreenThumb App. All rights reserved.</p>
-                </div>
-            </body>
-            </html>
-            '''
-        )
-        mail.send(msg)
+        connection.send(message)
+    except Exception:
+        SMTP_SEND_FAILURES.inc(kind=kind)
+        raise
+    finally:
+        SMTP_SEND_SECONDS.observe(time.perf_counter() - started, kind=kind)
+
+def _clear_sensitive_content(email):
+    if email.sensitive:
+        email.html = ''
+        email.body = None
+
+def _record_outbox_failure(email, error):
+    email.attempts += 1
+    email.last_error = str(error)[:500]
+    email.claim_token = None
+    if email.attempts >= current_app.config['OUTBOX_MAX_ATTEMPTS']:
+        email.status = 'failed'
+        _clear_sensitive_content(email)
+        print(f"Failed to send email to {email.recipient} after {email.attempts} attempts: {error}")
+    else:
+        backoff = current_app.config['OUTBOX_RETRY_SECONDS'] * 2 ** (email.attempts - 1)
+        email.next_attempt_at = datetime.utcnow() + timedelta(seconds=backoff)
+
+class OutboxSender:
+    """Background thread that drains an app's outbox when woken or on a poll
+    interval, and purges old sent and failed emails about once an hour"""
+
+    PURGE_INTERVAL_SECONDS = 3600
+
+    def __init__(self, app):
+        self._app = app
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._next_purge = 0.0
+
+    def start(self):
+        """Start the thread if it is not running; it drains the outbox at once"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='outbox-sender', daemon=True)
+                self._thread.start()
+                self._wakeup.set()
+
+    def wake(self):
+        self.start()
+        self._wakeup.set()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(timeout=self._app.config['OUTBOX_POLL_SECONDS'])
+            self._wakeup.clear()
+            try:
+                with self._app.app_context():
+                    while drain_outbox():
+                        pass
+                    if time.monotonic() >= self._next_purge:
+                        purge_outbox()
+                        self._next_purge = time.monotonic() + self.PURGE_INTERVAL_SECONDS
+            except Exception as e:
+                print(f"❌ Outbox sender error: {e}")
+
+# Emails queued before a restart, or waiting to be retried, are picked up as
+# soon as the process serves its first request rather than on the next
+# queue_email(). CLI commands do not start the thread.
+def start_outbox_sender():
+    current_app.extensions['outbox_sender'].start()
+
+def purge_outbox():
+    """Delete sent and failed emails older than OUTBOX_RETENTION_DAYS"""
+    cutoff = datetime.utcnow() - timedelta(days=current_app.config['OUTBOX_RETENTION_DAYS'])
+    purged = OutboxEmail.query.filter(OutboxEmail.status.in_(('sent', 'failed')),
+                                      OutboxEmail.created_at < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+    return purged
+
+@bp.cli.command('send-outbox')
+def send_outbox_command():
+    """Send all due emails from the outbox once"""
+    sent = 0
+    while True:
+        attempted = drain_outbox()
+        if not attempted:
+            break
+        sent += attempted
+    print(f"✅ Processed {sent} outbox emails, purged {purge_outbox()} old ones")
+
+def check_watering_reminders(user_ids=None, first_user_id=None, last_user_id=None, now=None):
+    """Send reminders for due plants, optionally only for some users.
+
+    Limit the run with a list of user_ids or an inclusive user id range.
+    Plants are due by, and reminders recorded under, their owner's local
+    date at `now` (default: the current time), so every entry point agrees
+    on which day a reminder belongs to. Returns counts of users, plants and
+    digests sent, of digests or runs that failed, and of plants skipped
+    because another run holds a fresh claim on them.
+    """
+    stats = {'users': 0, 'plants': 0, 'sent': 0, 'failed': 0, 'pending': 0}
+    started = time.perf_counter()
+
+    # One digest per owner, all sent over a shared SMTP connection that is
+    # only opened once there is a digest to send. Flask-Mail reconnects
+    # after MAIL_MAX_EMAILS messages.
+    try:
+        dashboard_url = external_url('main.index')
+        with LazyMailConnection() as connection:
+            for due_plants, days in due_plant_batches(now, user_ids, first_user_id, last_user_id):
+                REMINDER_PLANTS_SCANNED.inc(len(due_plants))
+                claimed, held = claim_reminders(due_plants, days)
+                if claimed is None:
+                    # Another process claimed some of this batch; claim user by user
+                    claimed, held = [], 0
+                    for _user_id, plants in groupby(due_plants, key=attrgetter('user_id')):
+                        plants = list(plants)
+                        user_claimed, user_held = claim_reminders(plants, days)
+                        claimed.extend(user_claimed or [])
+                        held += len(plants) if user_claimed is None else user_held
+                stats['pending'] += held
+
+                sent, failed = [], []
+                for _user_id, plants in groupby(claimed, key=attrgetter('user_id')):
+                    plants = list(plants)
+                    stats['users'] += 1
+                    stats['plants'] += len(plants)
+                    if send_reminder_digest(plants[0].owner, plants, connection, dashboard_url):
+                        stats['sent'] += 1
+                        sent.extend(plants)
+                    else:
+                        stats['failed'] += 1
+                        failed.extend(plants)
+                settle_reminders(sent, failed, days)
     except Exception as e:
-        print(f"Failed to send reset email: {e}")
+        stats['failed'] += 1
+        print(f"Failed to send reminders: {e}")
+    REMINDER_RUN_SECONDS.observe(time.perf_counter() - started)
+    return stats
 
-def check_watering_reminders():
-    with app.app_context():
-        plants = Plant.query.all()
-        today = datetime.now().date()
-        
-        for plant in plants:
-            if plant.last_watered:
-                try:
-                    last_watered_date = datetime.strptime(plant.last_watered, '%Y-%m-%d').date()
-                    next_watering_date = last_watered_date + timedelta(days=plant.water_frequency)
-                    
-                    # If plant needs watering today or is overdue
-                    if today >= next_watering_date:
-                        send_reminder_email(plant)
-                except ValueError:
-                    print(f"Invalid date format for plant {plant.id}")
-
-def send_reminder_email(plant):
+def due_plant_batches(now=None, user_ids=None, first_user_id=None, last_user_id=None):
+    """Yield (plants, days) for due plants, a page at a time.
+
+    Plants are due by their owner's local date at `now`, which days maps
+    each plant id to. Pages are keyset pages of about REMINDER_BATCH_SIZE
+    plant rows in (user_id, id) order, with owners joined in, so memory
+    stays bounded however many plants an owner has. A page ends at an owner
+    boundary so that each digest is built from one page; only an owner who
+    fills a page alone has the rest of their due plants read into it. Each
+    page is read in full before the caller writes the ledger, as SQLite
+    cannot commit while a streaming cursor is open.
+    """
+    batch_size = current_app.config['REMINDER_BATCH_SIZE']
+
+    # Each timezone in use, with its local date; the CASE picks the owner's
+    # date in SQL, and the plain bound on next_due keeps the index usable
+    now = now or datetime.now(timezone.utc)
+    local_dates = {timezone_name: local_today(timezone_name, now)
+                   for (timezone_name,) in db.session.query(User.timezone).distinct()}
+    default_today = local_today(None, now)
+    named_dates = {name: day for name, day in local_dates.items() if name is not None}
+    owner_today = db.case(named_dates, value=User.timezone, else_=default_today) \
+        if named_dates else db.literal(default_today, db.Date)
+
+    plants = Plant.query.join(Plant.owner).options(contains_eager(Plant.owner)).filter(
+        Plant.next_due <= max([default_today, *local_dates.values()]),
+        Plant.next_due <= owner_today,
+    )
+    if user_ids is not None:
+        plants = plants.filter(Plant.user_id.in_(user_ids))
+    if first_user_id is not None:
+        plants = plants.filter(Plant.user_id >= first_user_id)
+    if last_user_id is not None:
+        plants = plants.filter(Plant.user_id <= last_user_id)
+    plants = plants.order_by(Plant.user_id, Plant.id)
+
+    after_user_id, after_id = 0, 0
+    while True:
+        # The plain bound on user_id lets the index seek to the page start
+        page = plants.filter(Plant.user_id >= after_user_id, db.or_(
+            Plant.user_id > after_user_id,
+            db.and_(Plant.user_id == after_user_id, Plant.id > after_id),
+        )).limit(batch_size).all()
+        if not page:
+            return
+        full = len(page) == batch_size
+        if full:
+            last_owner = page[-1].user_id
+            if page[0].user_id != last_owner:
+                # The last owner may go on past the limit; they start the next page
+                while page[-1].user_id == last_owner:
+                    page.pop()
+            else:
+                page += plants.filter(Plant.user_id == last_owner, Plant.id > page[-1].id).all()
+        after_user_id, after_id = page[-1].user_id, page[-1].id
+        yield page, {plant.id: local_dates.get(plant.owner.timezone, default_today) for plant in page}
+        if not full:
+            return
+
+def ledger_rows(plant_ids, days):
+    """Condition matching the ledger rows of plant_ids, each under days[plant_id]"""
+    by_day = {}
+    for plant_id in plant_ids:
+        by_day.setdefault(days[plant_id], []).append(plant_id)
+    return db.or_(*(db.and_(ReminderSent.sent_on == day, ReminderSent.plant_id.in_(ids))
+                    for day, ids in by_day.items()))
+
+def claim_reminders(plants, days):
+    """Claim reminders as pending in the ledger.
+
+    Each plant is recorded under days[plant.id], its owner's local date.
+    Plants already sent for that date are skipped, as are plants another
+    run claimed less than REMINDER_CLAIM_TIMEOUT_MINUTES ago; older claims
+    are from a run that stopped mid-send and are taken over. Returns the
+    plants claimed and how many were held by another run, or (None, 0),
+    with nothing claimed, if another process claimed any of them at the
+    same time.
+    """
+    now = datetime.utcnow()
+    stale_before = now - timedelta(minutes=current_app.config['REMINDER_CLAIM_TIMEOUT_MINUTES'])
+    # A separate connection keeps the session's loaded plants from expiring
     try:
-        user_email = plant.owner.email
-        msg = Message(
-            subject=f'💧 Time to water your {plant.name}!',
-            recipients=[user_email],
-            html=f'''
-            <!DOCTYPE html>
-            <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto;">
-                <div style="background: linear-gradient(135deg, #2e7d32, #4caf50); padding: 20px; text-align: center;">
-                    <h1 style="color: white; margin: 0;">💧 Watering Reminder</h1>
-                </div>
-                <div style="padding: 20px; background: #f9f9f9;">
-                    <h2>Hello Plant Lover!</h2>
-                    <p>It's time to give your <strong>{plant.name}</strong> some love! 💚</p>
-                    
-                    <div style="background: white; padding: 15px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #4caf50;">
-                        <h3 style="margin-top: 0;">Plant Details:</h3>
-                        <p><strong>Name:</strong> {plant.name}</p>
-                        <p><strong>Type:</strong> {plant.plant_type or 'Not specified'}</p>
-                        <p><strong>Last watered:</strong> {plant.last_watered}</p>
-                        <p><strong>Water every:</strong> {plant.water_frequency} days</p>
-                    </div>
-                    
-                    <p>Your plant will thank you for the hydration! 🌱</p>
-                    
-                    <div style="text-align: center; margin: 30px 0;">
-                        <a href="{url_for('index', _external=True)}" style="background: #4caf50; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block;">Mark as Watered</a>
-                    </div>
-                </div>
-                <div style="background:极速赛车开奖结果记录
-                    <p>© 2025 GreenThumb App. All rights reserved.</p>
-                </div>
-            </body>
-            </html>
-            '''
-        )
-        mail.send(msg)
-        print(f"Reminder sent to {user_email} for {plant.name}")
+        with db.engine.begin() as connection:
+            existing = connection.execute(
+                db.select(ReminderSent.plant_id, ReminderSent.sent_on, ReminderSent.status, ReminderSent.claimed_at)
+                .where(ledger_rows([plant.id for plant in plants], days))
+            ).all()
+            stale = {(plant_id, day) for plant_id, day, status, claimed_at in existing
+                     if status == 'pending' and claimed_at < stale_before}
+            if stale:
+                connection.execute(ReminderSent.__table__.delete().where(
+                    ReminderSent.status == 'pending', ReminderSent.claimed_at < stale_before,
+                    ledger_rows([plant_id for plant_id, _day in stale], days),
+                ))
+            taken = {(plant_id, day) for plant_id, day, _status, _claimed_at in existing} - stale
+            held = sum(1 for plant_id, day, status, _claimed_at in existing
+                       if status == 'pending' and (plant_id, day) not in stale)
+            plants = [plant for plant in plants if (plant.id, days[plant.id]) not in taken]
+            if plants:
+                connection.execute(ReminderSent.__table__.insert(), [
+                    {'plant_id': plant.id, 'sent_on': days[plant.id], 'status': 'pending', 'claimed_at': now}
+                    for plant in plants
+                ])
+    except IntegrityError:
+        return None, 0
+    return plants, held
+
+def settle_reminders(sent, failed, days):
+    """Mark the plants of accepted digests as sent, and drop the claims of
+    failed ones so a retry can send them; one statement each per batch"""
+    with db.engine.begin() as connection:
+        if sent:
+            connection.execute(ReminderSent.__table__.update()
+                               .where(ledger_rows([plant.id for plant in sent], days))
+                               .values(status='sent', claimed_at=None))
+        if failed:
+            connection.execute(ReminderSent.__table__.delete()
+                               .where(ledger_rows([plant.id for plant in failed], days)))
+
+def external_url(endpoint, **values):
+    """url_for(..., _external=True) that also works outside a request"""
+    if has_request_context():
+        return url_for(endpoint, _external=True, **values)
+    with current_app.test_request_context(base_url=current_app.config['BASE_URL']):
+        return url_for(endpoint, _external=True, **values)
+
+def send_reminder_digest(user, plants, connection, dashboard_url):
+    """Send one email listing all of a user's plants that need water,
+    returning whether the SMTP server accepted it"""
+    from flask_mail import Message
+    try:
+        if len(plants) == 1:
+            subject = f'💧 Time to water your {plants[0].name}!'
+        else:
+            subject = f'💧 {len(plants)} of your plants need water today!'
+
+        html, body = render_email('reminder_digest', plants=plants, dashboard_url=dashboard_url)
+        send_message(connection, Message(subject=subject, recipients=[user.email], html=html, body=body), 'reminder')
+        print(f"Reminder sent to {user.email} for {len(plants)} plants")
+        return True
     except Exception as e:
         print(f"Failed to send email: {e}")
+        return False
 
 # Add this route to manually trigger reminders
-@app.route('/send-reminders')
+@bp.route('/send-reminders')
 @login_required
 def send_reminders():
     check_watering_reminders()
     flash('Watering reminders have been checked and sent!', 'info')
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
+
+# Standalone reminder run, e.g. from a cron or Heroku Scheduler job:
+#   flask reminders run --shards 4
+reminders_cli = AppGroup('reminders', help='Watering reminder jobs.')
+
+@reminders_cli.command('run')
+@click.option('--shards', default=0, help='Worker processes, each taking a user id range (default: one per CPU).')
+def run_reminders_command(shards):
+    """Send today's reminders for every user, split across processes"""
+    from concurrent.futures import ProcessPoolExecutor
+
+    shards = shards or os.cpu_count() or 1
+    first_id, last_id = db.session.query(db.func.min(User.id), db.func.max(User.id)).one()
+    if first_id is None:
+        print("No users to remind.")
+        return
+
+    shard_size = -(-(last_id - first_id + 1) // shards)
+    ranges = [(start, min(start + shard_size - 1, last_id))
+              for start in range(first_id, last_id + 1, shard_size)]
+
+    # Child processes must open their own database connections
+    db.session.remove()
+    db.engine.dispose()
+
+    print(f"🌿 Sending reminders for users {first_id}-{last_id} in {len(ranges)} shards")
+    started = time.perf_counter()
+    totals = {'users': 0, 'plants': 0, 'sent': 0, 'failed': 0, 'pending': 0}
+    crashed = 0
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = {executor.submit(run_reminder_shard, current_app.config['CONFIG_NAME'], first, last): number
+                   for number, (first, last) in enumerate(ranges, start=1)}
+        for future in as_completed(futures):
+            number = futures[future]
+            first, last = ranges[number - 1]
+            try:
+                stats = future.result()
+            except Exception as e:
+                print(f"❌ Shard {number}/{len(ranges)} (users {first}-{last}) failed: {e}")
+                crashed += 1
+                continue
+            for key in totals:
+                totals[key] += stats[key]
+            icon = "❌" if stats['failed'] else "✅"
+            print(f"{icon} Shard {number}/{len(ranges)} (users {first}-{last}): {stats['sent']} of "
+                  f"{stats['users']} digests sent, {stats['failed']} failed for {stats['plants']} plants, "
+                  f"{stats['pending']} plants held by another run in {stats['seconds']:.2f}s")
+
+    icon = "❌" if totals['failed'] or crashed else "✅"
+    print(f"{icon} Sent {totals['sent']} of {totals['users']} digests, {totals['failed']} failed for "
+          f"{totals['plants']} plants, {totals['pending']} plants held by another run "
+          f"in {time.perf_counter() - started:.2f}s")
+    if crashed or totals['failed']:
+        raise click.ClickException(f"{totals['failed']} digests failed and {crashed} of "
+                                   f"{len(ranges)} shards crashed")
+
+def run_reminder_shard(config_name, first_user_id, last_user_id):
+    """Process pool task: one shard of a reminder run, with its own app and SMTP connection"""
+    started = time.perf_counter()
+    with create_app(config_name).app_context():
+        stats = check_watering_reminders(first_user_id=first_user_id, last_user_id=last_user_id)
+    stats['seconds'] = time.perf_counter() - started
+    return stats
+
+bp.cli.add_command(reminders_cli)
 
 # Automated scheduling function
-def schedule_watering_reminders():
-    """Schedule reminder checks for each user's preferred time"""
+def dispatch_watering_reminders(now=None):
+    """Run the reminder check for users whose reminder time has arrived.
+
+    Users are grouped by timezone; for each group the slot lookup uses the
+    (timezone, reminder_time) index, and check_watering_reminders() judges
+    due plants by the users' local date. last_reminder_date is set once a
+    batch has been sent with no failures and no plants held by another run,
+    so a user is checked once per local day; other batches are retried on
+    the following runs within the catch-up window, and the sent-reminder
+    ledger keeps digests that did go out from being repeated.
+    """
+    now = now or datetime.now(timezone.utc)
+    catchup = timedelta(minutes=current_app.config['REMINDER_CATCHUP_MINUTES'])
+    batch_size = current_app.config['REMINDER_BATCH_SIZE']
+
+    for (timezone_name,) in db.session.query(User.timezone).distinct().all():
+        try:
+            local_now = now.astimezone(ZoneInfo(timezone_name or current_app.config['DEFAULT_TIMEZONE']))
+        except (ZoneInfoNotFoundError, ValueError):
+            print(f"❌ Unknown timezone: {timezone_name}")
+            continue
+
+        local_date = local_now.date()
+        slot = local_now.strftime('%H:%M')
+        # Pick up slots missed while the scheduler was not running, within today
+        window_start = max(local_now - catchup, local_now.replace(hour=0, minute=0)).strftime('%H:%M')
+
+        due_users = db.session.query(User.id).filter(
+            User.timezone == timezone_name if timezone_name else User.timezone.is_(None),
+            User.reminder_time.between(window_start, slot),
+            db.or_(User.last_reminder_date.is_(None), User.last_reminder_date < local_date),
+        )
+        user_ids = [user_id for (user_id,) in due_users]
+
+        for start in range(0, len(user_ids), batch_size):
+            batch = user_ids[start:start + batch_size]
+            stats = check_watering_reminders(batch, now=now)
+            if stats['failed'] or stats['pending']:
+                continue
+            User.query.filter(User.id.in_(batch)).update(
+                {User.last_reminder_date: local_date}, synchronize_session=False
+            )
+            db.session.commit()
+
+def run_reminder_dispatcher(app):
+    """Scheduler job: dispatch reminders only in the process holding the lease"""
+    with app.app_context():
+        if not acquire_lease('reminders', app.config['SCHEDULER_LEASE_SECONDS']):
+            return
+        purge_reminder_ledger()
+        purge_password_reset_tokens()
+        dispatch_watering_reminders()
+
+# Identifies this process as a lease holder
+PROCESS_ID = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+
+def acquire_lease(name, ttl):
+    """Take or renew the named lease, returning True if this process holds it.
+
+    The holder renews on every run; if it stops, another process takes over
+    once the lease expires.
+    """
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ttl)
+    renewed = SchedulerLease.query.filter(
+        SchedulerLease.name == name,
+        db.or_(SchedulerLease.holder == PROCESS_ID, SchedulerLease.expires_at < now),
+    ).update({SchedulerLease.holder: PROCESS_ID, SchedulerLease.expires_at: expires_at}, synchronize_session=False)
+    if renewed:
+        db.session.commit()
+        return True
+
+    if SchedulerLease.query.get(name) is not None:
+        db.session.rollback()
+        return False
     try:
-        with app.app_context():
-            # Check if database exists first
-            try:
-                # Try a simple query to check if database is accessible
-                user_count = User.query.count()
-                print(f"✅ Database accessible. Found {user_count} users.")
-            except:
-                print("⚠️  Database not ready yet. Skipping scheduler setup.")
-                return
-            
-            # Clear existing jobs
-            scheduler.remove_all_jobs()
-            
-            # Get all users and schedule for their preferred times
-            users = User.query.all()
-            for user in users:
-                if user.reminder_time:
-                    try:
-                        # Parse the time (HH:MM)
-                        hour, minute = map(int, user.reminder_time.split(':'))
-                        
-                        # Schedule job for this user's time
-                        scheduler.add_job(
-                            func=check_watering_reminders,
-                            trigger=CronTrigger(hour=hour, minute=minute),
-                            id=f'daily_watering_check_{user.id}',
-                            name=f'Daily reminders for {user.email} at {user.reminder_time}',
-                            replace_existing=True
-                        )
-                        print(f"✅ Scheduled reminders for {user.email} at {user.reminder_time}")
-                        
-                    except (ValueError, AttributeError):
-                        print(f"❌ Invalid time format for user {user.email}: {user.reminder_time}")
-                        continue
-            
-            if not scheduler.running:
-                scheduler.start()
-            print("✅ All reminder schedules set up successfully!")
+        db.session.add(SchedulerLease(name=name, holder=PROCESS_ID, expires_at=expires_at))
+        db.session.commit()
+        return True
+    except IntegrityError:
+        db.session.rollback()
+        return False
+
+def release_lease(name):
+    """Expire a lease this process holds so another can take over at once"""
+    SchedulerLease.query.filter_by(name=name, holder=PROCESS_ID).update(
+        {SchedulerLease.expires_at: datetime.utcnow()}, synchronize_session=False
+    )
+    db.session.commit()
+
+def purge_reminder_ledger():
+    cutoff = datetime.now().date() - timedelta(days=current_app.config['REMINDER_LEDGER_DAYS'])
+    ReminderSent.query.filter(ReminderSent.sent_on < cutoff).delete(synchronize_session=False)
+    db.session.commit()
+
+def purge_password_reset_tokens():
+    """Delete expired reset tokens, and reset emails old enough that their
+    link has expired, returning how many tokens were deleted"""
+    now = datetime.utcnow()
+    purged = PasswordResetToken.query.filter(PasswordResetToken.expires_at <= now) \
+        .delete(synchronize_session=False)
+    expired_before = now - timedelta(minutes=current_app.config['PASSWORD_RESET_TOKEN_MINUTES'])
+    OutboxEmail.query.filter(OutboxEmail.sensitive.is_(True), OutboxEmail.created_at <= expired_before) \
+        .delete(synchronize_session=False)
+    db.session.commit()
+    return purged
+
+@bp.cli.command('purge-reset-tokens')
+def purge_reset_tokens_command():
+    """Delete expired password reset tokens"""
+    print(f"✅ Purged {purge_password_reset_tokens()} expired password reset tokens")
+
+def schedule_watering_reminders(app):
+    """Start a scheduler whose dispatcher checks reminder times every minute"""
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from apscheduler.triggers.cron import CronTrigger
+
+    scheduler = BackgroundScheduler()
+    try:
+        scheduler.add_job(
+            func=run_reminder_dispatcher,
+            args=[app],
+            trigger=CronTrigger(minute='*'),
+            id='watering_reminder_dispatcher',
+            name='Watering reminder dispatcher',
+            replace_existing=True,
+            coalesce=True,
+            max_instances=1
+        )
+        
+        scheduler.start()
+        atexit.register(shutdown_scheduler, app, scheduler)
+        print("✅ Reminder dispatcher scheduled successfully!")
             
     except Exception as e:
         print(f"❌ Failed to start scheduler: {e}")
+    return scheduler
+
+_scheduler_lock = threading.Lock()
+
+# Every process (each gunicorn worker too) runs the scheduler; the database
+# lease lets only one of them dispatch reminders at a time. It is started by
+# the first request a process serves, so CLI commands, shard workers and a
+# preloading gunicorn master never run scheduler threads.
+def start_scheduler():
+    app = current_app._get_current_object()
+    if 'scheduler' in app.extensions:
+        return
+    with _scheduler_lock:
+        if 'scheduler' not in app.extensions:
+            app.extensions['scheduler'] = schedule_watering_reminders(app)
 
 # Scheduler shutdown handler
-@atexit.register
-def shutdown_scheduler():
+def shutdown_scheduler(app, scheduler):
     if scheduler.running:
         scheduler.shutdown()
+        try:
+            with app.app_context():
+                release_lease('reminders')
+        except Exception as e:
+            print(f"Failed to release scheduler lease: {e}")
         print("Scheduler shut down gracefully")
 
+# [started, SQL statements, SQL seconds] for the request running in this context
+_request_metrics = ContextVar('request_metrics', default=None)
+
+def start_request_metrics():
+    _request_metrics.set([time.perf_counter(), 0, 0.0])
+
+def record_request_metrics(response):
+    started, statements, sql_seconds = _request_metrics.get()
+    _request_metrics.set(None)
+    endpoint = request.endpoint or 'unmatched'
+    method = request.method
+    REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint, method=method)
+    REQUESTS.inc(endpoint=endpoint, method=method, status=str(response.status_code))
+    REQUEST_SQL_STATEMENTS.observe(statements, endpoint=endpoint)
+    REQUEST_SQL_SECONDS.observe(sql_seconds, endpoint=endpoint)
+    SQL_STATEMENTS.inc(statements)
+    SQL_SECONDS.inc(sql_seconds)
+    return response
+
+def configure_sqlite(engine, settings):
+    """Set the SQLITE_* pragmas on every new connection.
+
+    WAL lets readers run alongside the one writer, and busy_timeout makes a
+    writer wait for the lock rather than fail with "database is locked".
+    """
+    pragmas = [
+        f"PRAGMA journal_mode={settings['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={settings['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(settings['SQLITE_BUSY_TIMEOUT_MS'])}",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size=-{int(settings['SQLITE_CACHE_SIZE_KIB'])}",
+        f"PRAGMA mmap_size={int(settings['SQLITE_MMAP_SIZE'])}",
+    ]
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    event.listen(engine, 'connect', set_pragmas)
+
+def instrument_engine(engine):
+    """Count and time SQL statements and pool checkouts on an engine.
+
+    The dialect's execute methods are wrapped instead of listening for
+    cursor events: any engine-level listener sends every connection, begin
+    and commit through SQLAlchemy's event dispatch, which cost more than
+    the metrics themselves.
+    """
+    dialect = engine.dialect
+    for name in ('do_execute', 'do_execute_no_params', 'do_executemany'):
+        setattr(dialect, name, _timed_execute(getattr(dialect, name)))
+    _time_pool_checkouts(engine)
+
+    # dispose() replaces the pool, so time the new one too
+    dispose = engine.dispose
+
+    def dispose_and_time(*args, **kwargs):
+        dispose(*args, **kwargs)
+        _time_pool_checkouts(engine)
+
+    engine.dispose = dispose_and_time
+
+def _timed_execute(execute):
+    def timed_execute(cursor, statement, *args):
+        started = time.perf_counter()
+        try:
+            return execute(cursor, statement, *args)
+        finally:
+            elapsed = time.perf_counter() - started
+            # Statements in a request are added to the totals when it finishes
+            request_metrics = _request_metrics.get()
+            if request_metrics is not None:
+                request_metrics[1] += 1
+                request_metrics[2] += elapsed
+            else:
+                SQL_STATEMENTS.inc()
+                SQL_SECONDS.inc(elapsed)
+    return timed_execute
+
+def _time_pool_checkouts(engine):
+    pool = engine.pool
+    checkout = pool.connect
+
+    def timed_checkout():
+        started = time.perf_counter()
+        try:
+            return checkout()
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started)
+
+    pool.connect = timed_checkout
+
+def metrics_view():
+    token = current_app.config['METRICS_TOKEN']
+    if token:
+        supplied = request.headers.get('Authorization', '')
+        if not secrets.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+            abort(404)
+    elif not current_app.debug:
+        abort(404)
+    return current_app.response_class(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def get_mail():
+    """Flask-Mail state for the current app, set up on first use"""
+    if 'mail' not in current_app.extensions:
+        from flask_mail import Mail
+        Mail().init_app(current_app._get_current_object())
+    return current_app.extensions['mail']
+
+class LazyMailConnection:
+    """Flask-Mail connection that connects on the first send, so a run with
+    nothing to send skips the SMTP (and TLS) handshake. If connecting fails,
+    later sends fail with the same error instead of trying again."""
+
+    def __init__(self):
+        # Set up Flask-Mail now: Message() reads its default sender
+        self._mail = get_mail()
+        self._connection = None
+        self._error = None
+
+    def __enter__(self):
+        return self
+
+    def send(self, message):
+        if self._error is not None:
+            raise self._error
+        if self._connection is None:
+            try:
+                self._connection = self._mail.connect().__enter__()
+            except Exception as e:
+                self._error = e
+                raise
+        self._connection.send(message)
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if self._connection is not None:
+            self._connection.__exit__(exc_type, exc_value, tb)
+
+# Fingerprinted static assets: `flask build-static` copies each file under
+# static/ to static/dist/ with a content hash in its name, plus .gz and .br
+# siblings for text types, and lists them in static/dist/manifest.json.
+# url_for('static', ...) then points at the hashed copy, which never changes
+# and so can be cached by browsers for good.
+STATIC_BUILD_DIR = 'dist'
+STATIC_MAX_AGE = 365 * 24 * 3600
+# Accept-Encoding name -> file suffix, in order of preference
+STATIC_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+def is_compressible(filename):
+    mimetype = mimetypes.guess_type(filename)[0] or ''
+    return mimetype.startswith('text/') or mimetype in (
+        'application/javascript', 'application/json', 'image/svg+xml', 'application/xml')
+
+def build_static_assets(static_folder):
+    """Write the hashed copies and manifest, returning the manifest"""
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+        print("⚠️ brotli is not installed; writing .gz files only")
+
+    output_dir = os.path.join(static_folder, STATIC_BUILD_DIR)
+    shutil.rmtree(output_dir, ignore_errors=True)
+    manifest = {}
+    for directory, dirnames, filenames in os.walk(static_folder):
+        if os.path.samefile(directory, static_folder) and STATIC_BUILD_DIR in dirnames:
+            dirnames.remove(STATIC_BUILD_DIR)
+        for filename in sorted(filenames):
+            source = os.path.join(directory, filename)
+            name = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                content = f.read()
+            stem, extension = os.path.splitext(name)
+            hashed = f'{STATIC_BUILD_DIR}/{stem}.{hashlib.sha256(content).hexdigest()[:12]}{extension}'
+
+            variants = {'': content}
+            if is_compressible(name):
+                variants['.gz'] = gzip.compress(content, compresslevel=9, mtime=0)
+                if brotli is not None:
+                    variants['.br'] = brotli.compress(content, quality=11)
+            target = os.path.join(static_folder, *hashed.split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            encodings = []
+            for encoding, suffix in (('identity', ''),) + STATIC_ENCODINGS:
+                # Only keep compressed copies that are actually smaller
+                if suffix in variants and (not suffix or len(variants[suffix]) < len(content)):
+                    with open(target + suffix, 'wb') as f:
+                        f.write(variants[suffix])
+                    if suffix:
+                        encodings.append(encoding)
+            manifest[name] = {'path': hashed, 'encodings': encodings}
+
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+@bp.cli.command('build-static')
+def build_static_command():
+    """Write fingerprinted and precompressed copies of the static files"""
+    manifest = build_static_assets(current_app.static_folder)
+    print(f"✅ Built {len(manifest)} static assets into static/{STATIC_BUILD_DIR}/")
+
+def load_static_manifest(app):
+    """Serve fingerprinted assets if `flask build-static` has been run"""
+    path = os.path.join(app.static_folder, STATIC_BUILD_DIR, 'manifest.json')
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        print("⚠️ No static manifest; run `flask build-static` to fingerprint static files")
+        return
+    app.extensions['static_assets'] = {
+        'urls': {name: entry['path'] for name, entry in manifest.items()},
+        'encodings': {entry['path']: entry['encodings'] for entry in manifest.values()},
+    }
+    app.url_defaults(fingerprint_static_url)
+    app.view_functions['static'] = serve_static
+
+def fingerprint_static_url(endpoint, values):
+    if endpoint == 'static':
+        urls = current_app.extensions['static_assets']['urls']
+        values['filename'] = urls.get(values.get('filename'), values.get('filename'))
+
+def serve_static(filename):
+    """Static files; fingerprinted ones are sent precompressed when the client
+    accepts it and marked immutable"""
+    encodings = current_app.extensions['static_assets']['encodings'].get(filename)
+    if encodings is None:
+        return current_app.send_static_file(filename)
+
+    for encoding, suffix in STATIC_ENCODINGS:
+        if encoding in encodings and request.accept_encodings[encoding]:
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            response = send_from_directory(current_app.static_folder, filename + suffix, mimetype=mimetype,
+                                           max_age=STATIC_MAX_AGE)
+            response.content_encoding = encoding
+            break
+    else:
+        response = send_from_directory(current_app.static_folder, filename, max_age=STATIC_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    if encodings:
+        response.vary.add('Accept-Encoding')
+    return response
+
+def create_app(config_name=None):
+    """Build the app for a config in config.py: development, production,
+    testing, or FLASK_CONFIG (default: settings from the environment).
+
+    Nothing here touches the database; run `flask upgrade-db` to create or
+    upgrade the schema.
+    """
+    config_name = config_name or config('FLASK_CONFIG', default='default')
+    app = Flask(__name__)
+    app.config.from_object(config_by_name[config_name])
+    app.config['CONFIG_NAME'] = config_name
+
+    db.init_app(app)
+    bcrypt.init_app(app)
+    login_manager.init_app(app)
+    app.register_blueprint(bp)
+
+    app.extensions['user_cache'] = LRUCache(maxsize=app.config['USER_CACHE_SIZE'],
+                                            ttl=app.config['USER_CACHE_TTL'])
+    app.extensions['plant_summary_cache'] = LRUCache(maxsize=app.config['DASHBOARD_CACHE_SIZE'])
+    app.extensions['page_cache'] = LRUCache(maxsize=app.config['PAGE_CACHE_SIZE'])
+    app.extensions['fragment_cache'] = LRUCache(maxsize=app.config['FRAGMENT_CACHE_SIZE'])
+    app.extensions['outbox_sender'] = OutboxSender(app)
+    if app.config['WRITE_QUEUE_ENABLED']:
+        app.extensions['write_queue'] = WriteQueue(app)
+
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            configure_sqlite(db.engine, app.config)
+
+    if app.config['METRICS_ENABLED']:
+        app.before_request(start_request_metrics)
+        app.after_request(record_request_metrics)
+        app.add_url_rule('/metrics', 'metrics', metrics_view)
+        with app.app_context():
+            instrument_engine(db.engine)
+
+    if app.config['STATIC_FINGERPRINTS']:
+        load_static_manifest(app)
+
+    app.before_request(start_outbox_sender)
+    if app.config['SCHEDULER_ENABLED']:
+        app.before_request(start_scheduler)
+    return app
+
+# `gunicorn app:app` and `flask --app app` look up a module-level app; it is
+# built on first access instead of at import
+def __getattr__(name):
+    if name == 'app':
+        globals()['app'] = create_app()
+        return globals()['app']
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 if __name__ == '__main__':
-    # Start the app first, then try scheduler (but don't crash if it fails)
     print("🌿 Starting GreenThumb App...")
-    
-    # Try to start scheduler, but don't let it break the app
-    try:
-        schedule_watering_reminders()
-        print("✅ Scheduler started successfully!")
-    except Exception as e:
-        print(f"⚠️  Scheduler not started (will work after database creation): {e}")
-    
+    app = create_app('development')
+    with app.app_context():
+        db.create_all()
+        upgrade_database()
     print("🚀 App is running! Visit: http://localhost:5000")
-    print("💡 Register a user first to create the database")
 
     app.run(debug=True)
-
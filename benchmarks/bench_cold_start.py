@@ -0,0 +1,90 @@
+"""Benchmark cold start: import time, app creation and time-to-first-request.
+
+Each run starts a fresh interpreter that imports app.py, builds the app and
+serves GET /login through the test client, timing each step. One extra run
+with `python -X importtime` lists the slowest modules imported by app.py.
+--root points at another checkout (e.g. a `git worktree` of an older
+commit, where importing app.py still built the app) to compare against.
+
+    python benchmarks/bench_cold_start.py --runs 10
+    python benchmarks/bench_cold_start.py --root /tmp/greenthumb-old
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = '''
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import app as module
+imported = time.perf_counter()
+application = module.create_app({config!r}) if 'create_app' in vars(module) else module.app
+created = time.perf_counter()
+status = application.test_client().get('/login').status_code
+served = time.perf_counter()
+print('TIMINGS', json.dumps({{'import': imported - start, 'create_app': created - imported,
+                  'first_request': served - created, 'status': status}}))
+'''
+
+
+def run_child(root, config_name, importtime=False):
+    env = dict(os.environ, DATABASE_URL='sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else [])
+    command += ['-c', CHILD.format(root=root, config=config_name)]
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=root, env=env, capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    timings = json.loads(next(line for line in result.stdout.splitlines()
+                              if line.startswith('TIMINGS '))[len('TIMINGS '):])
+    assert timings.pop('status') == 200
+    timings['process'] = elapsed
+    return timings, result.stderr
+
+
+def slowest_app_imports(importtime_output, count):
+    """Modules imported directly by app.py, by cumulative microseconds"""
+    pending = []
+    for line in importtime_output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _self, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 1:
+            pending.append((int(cumulative), name.strip()))
+        elif depth == 0:
+            if name.strip() == 'app':
+                return sorted(pending, reverse=True)[:count]
+            pending = []
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--config', default='production', help='config name passed to create_app()')
+    parser.add_argument('--root', default=ROOT, help='checkout to import app.py from')
+    parser.add_argument('--top', type=int, default=10, help='slowest imports to list')
+    args = parser.parse_args()
+
+    runs = [run_child(args.root, args.config)[0] for _ in range(args.runs)]
+    print(f"{'step':>14} {'median ms':>10} {'max ms':>9}")
+    for step in ('import', 'create_app', 'first_request', 'process'):
+        values = [run[step] * 1000 for run in runs]
+        print(f"{step:>14} {statistics.median(values):>10.1f} {max(values):>9.1f}")
+
+    _timings, importtime_output = run_child(args.root, args.config, importtime=True)
+    print(f"\n{'module':>24} {'cumulative ms':>14}")
+    for cumulative, name in slowest_app_imports(importtime_output, args.top):
+        print(f"{name:>24} {cumulative / 1000:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
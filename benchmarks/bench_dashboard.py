@@ -0,0 +1,78 @@
+"""Benchmark the dashboard route at different collection sizes.
+
+Each size is rendered twice: with every plant on one page (as the dashboard
+used to) and with the default DASHBOARD_PAGE_SIZE plus the cached summary.
+
+    python benchmarks/bench_dashboard.py --sizes 10 1000 10000 --requests 20
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def seed_plants(db, Plant, user_id, count):
+    today = date.today()
+    Plant.query.filter_by(user_id=user_id).delete()
+    db.session.execute(Plant.__table__.insert(), [
+        {
+            'name': f'Plant {i:06d}',
+            'last_watered': today - timedelta(days=i % 15),
+            'water_frequency': 7,
+            'next_due': today - timedelta(days=i % 15) + timedelta(days=7),
+            'user_id': user_id,
+        }
+        for i in range(count)
+    ])
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--requests', type=int, default=20)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    import app as greenthumb
+    from app import create_app, db, Plant, User
+
+    app = create_app('production')
+    app.config['BCRYPT_LOG_ROUNDS'] = 4
+    greenthumb.bcrypt.init_app(app)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(email='bench@example.com',
+                            password=greenthumb.bcrypt.generate_password_hash('secret').decode('utf-8')))
+        db.session.commit()
+        user_id = User.query.filter_by(email='bench@example.com').first().id
+
+    client = app.test_client()
+    client.post('/login', data={'email': 'bench@example.com', 'password': 'secret'})
+    page_size = app.config['DASHBOARD_PAGE_SIZE']
+
+    print(f"{'plants':>8} {'mode':>10} {'mean ms':>9} {'max ms':>9}")
+    for size in args.sizes:
+        with app.app_context():
+            seed_plants(db, Plant, user_id, size)
+            greenthumb.bump_plants_version(user_id)
+            db.session.commit()
+
+        for label, per_page in (('all', max(size, 1)), ('paginated', page_size)):
+            app.config['DASHBOARD_PAGE_SIZE'] = per_page
+            timings = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                response = client.get('/')
+                timings.append(time.perf_counter() - start)
+                assert response.status_code == 200
+            print(f"{size:>8} {label:>10} {sum(timings) / len(timings) * 1000:>9.2f} {max(timings) * 1000:>9.2f}")
+        app.config['DASHBOARD_PAGE_SIZE'] = page_size
+
+
+if __name__ == '__main__':
+    main()
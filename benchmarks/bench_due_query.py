@@ -0,0 +1,103 @@
+"""Benchmark the due-plant scan used by check_watering_reminders.
+
+Compares the old full-table loop (load every plant, work out its due date
+in Python) against due_plant_batches(), the keyset pages of due plants that
+check_watering_reminders() reads. Plants are spread over --plants-per-user
+per owner, so pages are cut at owner boundaries as they are in a real run.
+
+    python benchmarks/bench_due_query.py --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def seed(db, Plant, User, count, plants_per_user):
+    db.drop_all()
+    db.create_all()
+    users = -(-count // plants_per_user)
+    db.session.execute(User.__table__.insert(), [
+        {'id': i, 'email': f'bench{i}@example.com', 'password': 'x'} for i in range(1, users + 1)
+    ])
+
+    today = datetime.now().date()
+    rng = random.Random(42)
+    rows = []
+    for i in range(count):
+        last_watered = today - timedelta(days=rng.randint(0, 30))
+        water_frequency = rng.randint(1, 14)
+        rows.append({
+            'name': f'Plant {i}',
+            'plant_type': 'Fern',
+            'last_watered': last_watered,
+            'water_frequency': water_frequency,
+            'next_due': last_watered + timedelta(days=water_frequency),
+            'user_id': i // plants_per_user + 1,
+        })
+        if len(rows) == 10000:
+            db.session.execute(Plant.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(Plant.__table__.insert(), rows)
+    db.session.commit()
+
+
+def full_scan(Plant):
+    today = datetime.now().date()
+    due = 0
+    for plant in Plant.query.all():
+        if plant.last_watered and today >= plant.last_watered + timedelta(days=plant.water_frequency):
+            due += 1
+    return due
+
+
+def indexed_scan(due_plant_batches):
+    due = 0
+    for plants, _days in due_plant_batches():
+        due += len(plants)
+    return due
+
+
+def measure(db, func, *args):
+    db.session.expunge_all()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    db.session.expunge_all()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--plants-per-user', type=int, default=20)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+
+    from app import create_app, db, due_plant_batches, Plant, User
+
+    app = create_app('production')
+    with app.app_context():
+        print(f"{'plants':>10} {'path':>8} {'due':>9} {'seconds':>9} {'peak MiB':>9}")
+        for size in args.sizes:
+            seed(db, Plant, User, size, args.plants_per_user)
+            for label, func, arg in (('scan', full_scan, Plant), ('indexed', indexed_scan, due_plant_batches)):
+                due, elapsed, peak = measure(db, func, arg)
+                print(f"{size:>10} {label:>8} {due:>9} {elapsed:>9.3f} {peak / 2 ** 20:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
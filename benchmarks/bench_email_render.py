@@ -0,0 +1,83 @@
+"""Benchmark per-message render cost of reminder emails.
+
+Compares the inline f-string body the reminder job used to build with the
+cached Jinja templates in templates/email/ (HTML plus plain-text part).
+
+    python benchmarks/bench_email_render.py --messages 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def fstring_body(plant, dashboard_url):
+    return f'''
+            <!DOCTYPE html>
+            <html>
+            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 600px; margin: 0 auto;">
+                <div style="background: linear-gradient(135deg, #2e7d32, #4caf50); padding: 20px; text-align: center;">
+                    <h1 style="color: white; margin: 0;">💧 Watering Reminder</h1>
+                </div>
+                <div style="padding: 20px; background: #f9f9f9;">
+                    <h2>Hello Plant Lover!</h2>
+                    <p>It's time to give your <strong>{plant.name}</strong> some love! 💚</p>
+                    <div style="background: white; padding: 15px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #4caf50;">
+                        <h3 style="margin-top: 0;">Plant Details:</h3>
+                        <p><strong>Name:</strong> {plant.name}</p>
+                        <p><strong>Type:</strong> {plant.plant_type or 'Not specified'}</p>
+                        <p><strong>Last watered:</strong> {plant.last_watered}</p>
+                        <p><strong>Water every:</strong> {plant.water_frequency} days</p>
+                    </div>
+                    <p>Your plant will thank you for the hydration! 🌱</p>
+                    <div style="text-align: center; margin: 30px 0;">
+                        <a href="{dashboard_url}" style="background: #4caf50; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block;">Mark as Watered</a>
+                    </div>
+                </div>
+                <div style="background: #e8f5e8; padding: 15px; text-align: center; font-size: 12px; color: #666;">
+                    <p>© 2025 GreenThumb App. All rights reserved.</p>
+                </div>
+            </body>
+            </html>
+            '''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=100000)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    from app import create_app, render_email
+
+    app = create_app('production')
+
+    plant = SimpleNamespace(name='Monstera', plant_type='Tropical', last_watered='2025-01-01', water_frequency=7)
+    dashboard_url = 'https://greenthumb.example.com/'
+
+    with app.app_context():
+        # f-string path: also pays url_for per message, as the old code did
+        with app.test_request_context():
+            from flask import url_for
+            start = time.perf_counter()
+            for _ in range(args.messages):
+                fstring_body(plant, url_for('main.index', _external=True))
+            fstring_elapsed = time.perf_counter() - start
+
+        render_email('reminder_digest', plants=[plant], dashboard_url=dashboard_url)
+        start = time.perf_counter()
+        for _ in range(args.messages):
+            render_email('reminder_digest', plants=[plant], dashboard_url=dashboard_url)
+        template_elapsed = time.perf_counter() - start
+
+    print(f"{'path':>10} {'messages':>9} {'seconds':>9} {'us/msg':>9}")
+    for label, elapsed in (('f-string', fstring_elapsed), ('template', template_elapsed)):
+        print(f"{label:>10} {args.messages:>9} {elapsed:>9.3f} {elapsed / args.messages * 1e6:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
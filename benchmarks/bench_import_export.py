@@ -0,0 +1,115 @@
+"""Benchmark plant import and export: time and peak Python memory by size.
+
+For each --rows size, a CSV and a JSON file of that many plants are written
+to disk, uploaded to /import for a fresh user, and then downloaded again
+from /export. Every step runs twice: once for wall time, and once under
+tracemalloc for peak traced memory. Peak memory should stay about the same
+as the file grows.
+
+    python benchmarks/bench_import_export.py --rows 5000 50000
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+from seed_data import PLANTS  # noqa: E402
+
+
+def write_files(directory, rows, seed):
+    rng = random.Random(seed)
+    today = date.today()
+    plants = []
+    for number in range(rows):
+        name, plant_type, frequency = rng.choice(PLANTS)
+        plants.append({
+            'name': f'{name} {number}',
+            'plant_type': plant_type,
+            'water_frequency': frequency,
+            'last_watered': (today - timedelta(days=rng.randint(0, frequency))).isoformat(),
+        })
+    paths = {'csv': os.path.join(directory, f'plants-{rows}.csv'),
+             'json': os.path.join(directory, f'plants-{rows}.json')}
+    with open(paths['csv'], 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(plants[0]))
+        writer.writeheader()
+        writer.writerows(plants)
+    with open(paths['json'], 'w') as f:
+        json.dump(plants, f)
+    return paths
+
+
+def measure(step, traced):
+    """Run step() and return its wall time, or its peak traced MiB"""
+    if not traced:
+        start = time.perf_counter()
+        step()
+        return time.perf_counter() - start
+    tracemalloc.start()
+    step()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[5000, 50000])
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+    import app as greenthumb
+
+    app = greenthumb.create_app('production')
+    with app.app_context():
+        greenthumb.db.create_all()
+    users = iter(range(1, 1000))
+
+    def new_client():
+        client = app.test_client()
+        email = f'bench{next(users)}@example.com'
+        client.post('/register', data={'email': email, 'password': 'secret'})
+        client.post('/login', data={'email': email, 'password': 'secret'})
+        return client
+
+    print(f"{'rows':>7} {'format':>6} {'import s':>9} {'import MiB':>11} {'export s':>9} {'export MiB':>11}")
+    for rows in args.rows:
+        paths = write_files(workdir, rows, args.seed)
+        for file_format, path in paths.items():
+            figures = []
+            for traced in (False, True):
+                client = new_client()
+
+                def upload():
+                    with open(path, 'rb') as f:
+                        response = client.post('/import', data={'file': (f, os.path.basename(path))},
+                                               content_type='multipart/form-data')
+                    assert f'Imported {rows} plants' in response.text
+
+                def download():
+                    response = client.get(f'/export/{file_format}', buffered=False)
+                    size = sum(len(chunk) for chunk in response.response)
+                    response.close()
+                    assert size > rows
+
+                figures.append((measure(upload, traced), measure(download, traced)))
+            (import_seconds, export_seconds), (import_mib, export_mib) = figures
+            print(f"{rows:>7} {file_format:>6} {import_seconds:>9.2f} {import_mib:>11.1f} "
+                  f"{export_seconds:>9.2f} {export_mib:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
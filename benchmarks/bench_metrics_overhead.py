@@ -0,0 +1,91 @@
+"""Benchmark the cost of request, SQL and pool metrics on the dashboard route.
+
+Two apps share one SQLite database: one built with the default settings
+(METRICS_ENABLED on) and one with metrics off. Each round times a batch of
+dashboard requests on both, in alternating order, so drift on the machine
+affects both equally; the overhead is the median of the per-round ratios.
+Exits non-zero if it is above --max-overhead percent.
+
+    python benchmarks/bench_metrics_overhead.py --plants 200 --rounds 200 --requests 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def seed(db, Plant, User, bcrypt, plants):
+    db.create_all()
+    user = User(email='bench@example.com', password=bcrypt.generate_password_hash('secret').decode('utf-8'))
+    db.session.add(user)
+    db.session.commit()
+    today = date.today()
+    db.session.execute(Plant.__table__.insert(), [
+        {
+            'name': f'Plant {i:06d}',
+            'last_watered': today - timedelta(days=i % 15),
+            'water_frequency': 7,
+            'next_due': today - timedelta(days=i % 15) + timedelta(days=7),
+            'user_id': user.id,
+        }
+        for i in range(plants)
+    ])
+    db.session.commit()
+
+
+def logged_in_client(app):
+    client = app.test_client()
+    client.post('/login', data={'email': 'bench@example.com', 'password': 'secret'})
+    assert client.get('/').status_code == 200
+    return client
+
+
+def timed_round(client, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get('/')
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--plants', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=20, help='dashboard requests per round')
+    parser.add_argument('--max-overhead', type=float, default=2.0, help='percent')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+    import app as greenthumb
+    from config import ProductionConfig, config_by_name
+
+    config_by_name['bench-no-metrics'] = type('NoMetricsConfig', (ProductionConfig,), {'METRICS_ENABLED': False})
+    with_metrics = greenthumb.create_app('production')
+    without_metrics = greenthumb.create_app('bench-no-metrics')
+    with with_metrics.app_context():
+        seed(greenthumb.db, greenthumb.Plant, greenthumb.User, greenthumb.bcrypt, args.plants)
+
+    clients = {'metrics on': logged_in_client(with_metrics), 'metrics off': logged_in_client(without_metrics)}
+    timings = {label: [] for label in clients}
+    for round_number in range(args.rounds):
+        order = list(clients) if round_number % 2 == 0 else list(reversed(clients))
+        for label in order:
+            timings[label].append(timed_round(clients[label], args.requests))
+
+    print(f"{'app':>12} {'median ms':>10} {'min ms':>9}")
+    for label, values in timings.items():
+        print(f"{label:>12} {statistics.median(values) * 1000:>10.3f} {min(values) * 1000:>9.3f}")
+    ratios = [on / off for on, off in zip(timings['metrics on'], timings['metrics off'])]
+    overhead = (statistics.median(ratios) - 1) * 100
+    print(f"overhead: {overhead:+.2f}% (limit {args.max_overhead}%)")
+    sys.exit(1 if overhead > args.max_overhead else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark password checks per second at several bcrypt work factors.
+
+Checks go through the app's bounded hashing pool from as many client threads
+as there are pool workers plus pending slots, the way concurrent logins
+would. Rejected (busy) checks are counted separately.
+
+    python benchmarks/bench_password_hashing.py --costs 10 11 12 13 --seconds 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--costs', type=int, nargs='+', default=[10, 11, 12, 13])
+    parser.add_argument('--seconds', type=float, default=5.0, help='duration per cost')
+    parser.add_argument('--clients', type=int, help='concurrent login threads (default: workers + pending)')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    import app as greenthumb
+    from app import create_app, HashingBusy
+
+    app = create_app('production')
+
+    workers = app.config['BCRYPT_WORKERS'] or os.cpu_count() or 1
+    clients = args.clients or workers + app.config['BCRYPT_MAX_PENDING']
+    print(f"workers={workers} clients={clients}")
+    print(f"{'cost':>5} {'logins':>8} {'busy':>6} {'logins/s':>9} {'per core':>9} {'ms/login':>9}")
+
+    for cost in args.costs:
+        app.config['BCRYPT_LOG_ROUNDS'] = cost
+        greenthumb.bcrypt.init_app(app)
+        with app.app_context():
+            password_hash = greenthumb.password_hasher.hash('secret')
+
+        counts = {'ok': 0, 'busy': 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + args.seconds
+
+        def client():
+            while time.perf_counter() < deadline:
+                try:
+                    greenthumb.password_hasher.check(password_hash, 'secret')
+                    key = 'ok'
+                except HashingBusy:
+                    key = 'busy'
+                with lock:
+                    counts[key] += 1
+
+        threads = [threading.Thread(target=client) for _ in range(clients)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        rate = counts['ok'] / elapsed
+        per_core = rate / min(workers, os.cpu_count() or 1)
+        print(f"{cost:>5} {counts['ok']:>8} {counts['busy']:>6} {rate:>9.1f} {per_core:>9.1f} "
+              f"{1000 / per_core if per_core else 0:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
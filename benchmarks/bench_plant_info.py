@@ -0,0 +1,82 @@
+"""Benchmark requests per second on /plant-info with and without the page cache.
+
+Three modes against one logged-in user: rendering the template on every
+request (RENDER_CACHE_ENABLED off, the old behaviour), serving the cached
+page, and a browser revalidating with If-None-Match and getting a 304.
+Each round times a batch of requests in every mode, rotating the order, and
+the median round is reported.
+
+    python benchmarks/bench_plant_info.py --rounds 50 --requests 100
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def logged_in_client(app):
+    client = app.test_client()
+    client.post('/login', data={'email': 'bench@example.com', 'password': 'secret'})
+    # The first page after login shows the flash message and is not cached
+    assert client.get('/plant-info').status_code == 200
+    return client
+
+
+def timed_round(client, requests, headers=None, status=200):
+    start = time.perf_counter()
+    for _ in range(requests):
+        response = client.get('/plant-info', headers=headers)
+        assert response.status_code == status, response.status_code
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=100, help='requests per mode per round')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+    import app as greenthumb
+    from config import ProductionConfig, config_by_name
+
+    config_by_name['bench-no-cache'] = type('NoCacheConfig', (ProductionConfig,), {'RENDER_CACHE_ENABLED': False})
+    cached_app = greenthumb.create_app('production')
+    uncached_app = greenthumb.create_app('bench-no-cache')
+    with cached_app.app_context():
+        greenthumb.db.create_all()
+        greenthumb.db.session.add(greenthumb.User(
+            email='bench@example.com',
+            password=greenthumb.bcrypt.generate_password_hash('secret').decode('utf-8')))
+        greenthumb.db.session.commit()
+
+    uncached = logged_in_client(uncached_app)
+    cached = logged_in_client(cached_app)
+    etag = cached.get('/plant-info').headers['ETag']
+
+    modes = {
+        'render every time': (uncached, {}, 200),
+        'cached page': (cached, {}, 200),
+        '304 revalidation': (cached, {'If-None-Match': etag}, 304),
+    }
+    timings = {label: [] for label in modes}
+    for round_number in range(args.rounds):
+        shift = round_number % len(modes)
+        for label in list(modes)[shift:] + list(modes)[:shift]:
+            client, headers, status = modes[label]
+            timings[label].append(timed_round(client, args.requests, headers, status))
+
+    baseline = args.requests / statistics.median(timings['render every time'])
+    print(f"{'mode':>18} {'req/s':>9} {'speedup':>8}")
+    for label, values in timings.items():
+        rate = args.requests / statistics.median(values)
+        print(f"{label:>18} {rate:>9.0f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
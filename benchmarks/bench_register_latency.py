@@ -0,0 +1,92 @@
+"""Benchmark /register latency with a slow SMTP server.
+
+'inline' sends the welcome email inside the request, as register() used to;
+'outbox' only queues it and lets the background sender deliver it.
+
+    python benchmarks/bench_register_latency.py --requests 200 --concurrency 8 --smtp-delay 0.5
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(ROOT))
+
+from smtp_stub import StubSMTPServer
+
+
+def run_load(app, prefix, total, concurrency):
+    latencies = []
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            client.post('/register', data={'email': f'{prefix}{i}@example.com', 'password': 'secret'})
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--smtp-delay', type=float, default=0.5, help='seconds the stub waits per message')
+    args = parser.parse_args()
+
+    with StubSMTPServer(delay=args.smtp_delay) as smtp:
+        os.environ.update({
+            'DATABASE_URL': 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'),
+            'MAIL_SERVER': '127.0.0.1',
+            'MAIL_PORT': str(smtp.port),
+            'MAIL_USE_TLS': 'False',
+            'MAIL_USERNAME': 'bench@example.com',
+        })
+        import app as greenthumb
+
+        app = greenthumb.create_app('production')
+        with app.app_context():
+            greenthumb.db.create_all()
+
+        # Keep password hashing cheap so the email path dominates
+        app.config['BCRYPT_LOG_ROUNDS'] = 4
+        greenthumb.bcrypt.init_app(app)
+
+        outbox_sender = app.extensions['outbox_sender']
+        queued_wake = outbox_sender.wake
+
+        def inline_wake():
+            greenthumb.drain_outbox()
+
+        print(f"{'path':>8} {'requests':>9} {'p50 ms':>9} {'p99 ms':>9} {'req/s':>9}")
+        for label, wake in (('inline', inline_wake), ('outbox', queued_wake)):
+            outbox_sender.wake = wake
+            latencies, elapsed = run_load(app, label, args.requests, args.concurrency)
+            latencies.sort()
+            p50 = statistics.median(latencies) * 1000
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            print(f"{label:>8} {len(latencies):>9} {p50:>9.1f} {p99:>9.1f} {len(latencies) / elapsed:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark reminder delivery: one email per plant vs one digest per user.
+
+Both paths send to a local stub SMTP server, which reports how many
+connections (handshakes) each run opened. SQL statements are counted with
+an engine event. The digest path runs one query for the timezones in use,
+then per page of REMINDER_BATCH_SIZE due plants a fixed number of
+statements (due plants with their owners, ledger check, pending claims,
+marking them sent); none run per plant or user. The script exits non-zero
+if that count differs between --users sizes, so keep users x plants within
+one page.
+
+    python benchmarks/bench_reminder_email.py --users 20 80 --plants 10
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(ROOT))
+
+from sqlalchemy import event
+
+from smtp_stub import StubSMTPServer
+
+
+def seed(db, Plant, User, users, plants_per_user):
+    db.drop_all()
+    db.create_all()
+    db.session.execute(User.__table__.insert(), [
+        {'id': i, 'email': f'user{i}@example.com', 'password': 'x'} for i in range(1, users + 1)
+    ])
+    last_watered = datetime.now().date() - timedelta(days=10)
+    db.session.execute(Plant.__table__.insert(), [
+        {
+            'name': f'Plant {i}-{j}',
+            'last_watered': last_watered,
+            'water_frequency': 3,
+            'next_due': last_watered + timedelta(days=3),
+            'user_id': i,
+        }
+        for i in range(1, users + 1) for j in range(plants_per_user)
+    ])
+    db.session.commit()
+
+
+def per_plant_emails(app, get_mail, Message, Plant):
+    """The previous path: one mail.send (and SMTP session) per due plant"""
+    today = datetime.now().date()
+    with app.app_context():
+        for plant in Plant.query.filter(Plant.next_due <= today).all():
+            get_mail().send(Message(
+                subject=f'💧 Time to water your {plant.name}!',
+                recipients=[plant.owner.email],
+                html=f'<p>It is time to water your {plant.name}.</p>',
+            ))
+
+
+def run_in_context(app, func):
+    with app.app_context():
+        return func()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[20, 80])
+    parser.add_argument('--plants', type=int, default=10, help='due plants per user')
+    args = parser.parse_args()
+
+    with StubSMTPServer() as smtp:
+        os.environ.update({
+            'DATABASE_URL': 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'),
+            'MAIL_SERVER': '127.0.0.1',
+            'MAIL_PORT': str(smtp.port),
+            'MAIL_USE_TLS': 'False',
+            'MAIL_USERNAME': 'bench@example.com',
+        })
+        from flask_mail import Message
+        from app import create_app, db, get_mail, Plant, User, check_watering_reminders
+
+        app = create_app('production')
+        with app.app_context():
+            engine = db.engine
+
+        statements = []
+        event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        runs = (
+            ('per-plant', lambda: per_plant_emails(app, get_mail, Message, Plant)),
+            ('digest', lambda: run_in_context(app, check_watering_reminders)),
+        )
+        digest_queries = {}
+        print(f"{'users':>6} {'path':>10} {'messages':>9} {'handshakes':>11} {'queries':>8} {'seconds':>9} {'msg/s':>9}")
+        for users in args.users:
+            for label, run in runs:
+                # Each path starts from the same due plants and an empty ledger
+                with app.app_context():
+                    seed(db, Plant, User, users, args.plants)
+                smtp.reset()
+                statements.clear()
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    run()
+                elapsed = time.perf_counter() - start
+                if label == 'digest':
+                    digest_queries[users] = len(statements)
+                print(f"{users:>6} {label:>10} {smtp.messages:>9} {smtp.connections:>11} {len(statements):>8} "
+                      f"{elapsed:>9.3f} {smtp.messages / elapsed:>9.1f}")
+
+    if len(set(digest_queries.values())) > 1:
+        print(f'FAIL: digest statement count grows with users: {digest_queries}')
+        sys.exit(1)
+    print(f'ok: digest path ran {next(iter(digest_queries.values()))} SQL statements at every size')
+
+if __name__ == '__main__':
+    main()
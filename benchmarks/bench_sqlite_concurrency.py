@@ -0,0 +1,151 @@
+"""Benchmark concurrent SQLite writes: throughput and "database is locked" rate.
+
+Each worker is a separate process, like a gunicorn worker, with --threads
+request threads. Every thread waters and adds plants for its own users
+through run_write(), as the /water and /add views do. The same load runs
+at each worker count under three settings:
+
+    rollback journal  journal_mode=DELETE, synchronous=FULL (SQLite's defaults)
+    wal               the SQLITE_* defaults from config.py
+    wal + queue       the same, with WRITE_QUEUE_ENABLED
+
+    python benchmarks/bench_sqlite_concurrency.py --workers 1 4 16 --threads 4 --writes 100
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+sys.path.insert(0, ROOT)
+
+MODES = {
+    'rollback journal': {'SQLITE_JOURNAL_MODE': 'DELETE', 'SQLITE_SYNCHRONOUS': 'FULL'},
+    'wal': {},
+    'wal + queue': {'WRITE_QUEUE_ENABLED': 'True'},
+}
+PLANTS_PER_USER = 5
+
+
+def run_child(args):
+    """One worker process: run the write load and print counts as JSON"""
+    import contextlib
+    import io
+
+    from sqlalchemy.exc import OperationalError
+
+    import app as greenthumb
+
+    app = greenthumb.create_app('production')
+    counts = {'ok': 0, 'locked': 0, 'failed': 0}
+    lock = threading.Lock()
+
+    def thread(user_id):
+        with app.app_context():
+            plant_id = greenthumb.db.session.query(greenthumb.Plant.id).filter_by(user_id=user_id).first()[0]
+            ready.wait()
+            for i in range(args.writes):
+                try:
+                    if i % 2:
+                        greenthumb.run_write(greenthumb.insert_plant, user_id, f'Bench plant {i}', 'Tropical',
+                                             date.today(), 7)
+                    else:
+                        greenthumb.run_write(greenthumb.water_plants, user_id, date.today(), plant_ids=[plant_id])
+                    outcome = 'ok'
+                except OperationalError as e:
+                    greenthumb.db.session.rollback()
+                    outcome = 'locked' if 'locked' in str(e) else 'failed'
+                with lock:
+                    counts[outcome] += 1
+
+    first_user = args.child * args.threads + 1
+    threads = [threading.Thread(target=thread, args=(user_id,))
+               for user_id in range(first_user, first_user + args.threads)]
+    ready = threading.Event()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for t in threads:
+            t.start()
+        # Start writing when the parent says every worker is up
+        print('READY', file=sys.__stdout__, flush=True)
+        sys.stdin.readline()
+        started = time.perf_counter()
+        ready.set()
+        for t in threads:
+            t.join()
+    counts['seconds'] = time.perf_counter() - started
+    print('RESULT', json.dumps(counts))
+
+
+def run_workers(database, workers, args, settings):
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{database}', **settings)
+    children = [
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), '--child', str(number),
+                          '--threads', str(args.threads), '--writes', str(args.writes)],
+                         env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        for number in range(workers)
+    ]
+    for child in children:
+        while child.stdout.readline().strip() != 'READY':
+            if child.poll() is not None:
+                raise SystemExit(f'worker exited with {child.returncode}')
+    for child in children:
+        child.stdin.write('\n')
+        child.stdin.flush()
+
+    totals = {'ok': 0, 'locked': 0, 'failed': 0, 'seconds': 0.0}
+    for child in children:
+        output, _ = child.communicate()
+        if child.returncode:
+            raise SystemExit(f'worker exited with {child.returncode}')
+        result = json.loads(next(line for line in output.splitlines() if line.startswith('RESULT '))[len('RESULT '):])
+        for key in ('ok', 'locked', 'failed'):
+            totals[key] += result[key]
+        totals['seconds'] = max(totals['seconds'], result['seconds'])
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--threads', type=int, default=4, help='request threads per worker')
+    parser.add_argument('--writes', type=int, default=100, help='writes per thread')
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        run_child(args)
+        return
+
+    workdir = tempfile.mkdtemp()
+    template = os.path.join(workdir, 'seed.db')
+    subprocess.run([sys.executable, os.path.join(HERE, 'seed_data.py'), '--database-url', f'sqlite:///{template}',
+                    '--users', str(max(args.workers) * args.threads), '--plants', str(PLANTS_PER_USER)],
+                   check=True, stdout=subprocess.DEVNULL)
+
+    print(f"{'mode':>17} {'workers':>8} {'writes':>7} {'writes/s':>9} {'locked':>7} {'lock rate':>10}")
+    for mode in args.modes:
+        for workers in args.workers:
+            database = os.path.join(workdir, 'bench.db')
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(database + suffix):
+                    os.remove(database + suffix)
+            shutil.copyfile(template, database)
+            totals = run_workers(database, workers, args, MODES[mode])
+            attempted = totals['ok'] + totals['locked'] + totals['failed']
+            print(f"{mode:>17} {workers:>8} {totals['ok']:>7} {totals['ok'] / totals['seconds']:>9.0f} "
+                  f"{totals['locked']:>7} {totals['locked'] / attempted:>9.1%}"
+                  + (f"  ({totals['failed']} other errors)" if totals['failed'] else ''))
+    shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Check that reminders go out once per plant per day with several workers.
+
+Starts --workers processes against one SQLite (or --database-url) database
+and a local stub SMTP server. In round one every worker runs the scheduled
+job at once; only the lease holder may dispatch. In round two every worker
+calls check_watering_reminders() directly, as a retry after a restart
+would, and the sent-reminder ledger must stop any resend.
+
+The ledger is then cleared and one worker is killed right after its first
+digest is accepted. A retry straight away must leave the dead run's claims
+alone; once they are older than REMINDER_CLAIM_TIMEOUT_MINUTES, a retry
+must send every user's digest (the one accepted before the crash again, as
+it was never confirmed). Exits non-zero on any duplicate or missing
+reminder.
+
+    python benchmarks/check_multiworker_reminders.py --workers 4 --users 50 --plants 3
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(ROOT))
+
+from smtp_stub import StubSMTPServer
+
+
+def worker(mode, barrier):
+    import contextlib
+    import io
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as greenthumb
+        app = greenthumb.create_app('production')
+    barrier.wait()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'scheduled':
+            greenthumb.run_reminder_dispatcher(app)
+        elif mode == 'crash':
+            send_message = greenthumb.send_message
+
+            def send_and_die(*args):
+                send_message(*args)
+                os._exit(1)
+
+            greenthumb.send_message = send_and_die
+            with app.app_context():
+                greenthumb.check_watering_reminders()
+        else:
+            with app.app_context():
+                greenthumb.check_watering_reminders()
+
+
+def run_round(mode, workers):
+    barrier = multiprocessing.Barrier(workers)
+    processes = [multiprocessing.Process(target=worker, args=(mode, barrier)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--plants', type=int, default=3, help='due plants per user')
+    parser.add_argument('--database-url')
+    args = parser.parse_args()
+
+    with StubSMTPServer() as smtp:
+        os.environ.update({
+            'DATABASE_URL': args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'),
+            'MAIL_SERVER': '127.0.0.1',
+            'MAIL_PORT': str(smtp.port),
+            'MAIL_USE_TLS': 'False',
+            'MAIL_USERNAME': 'bench@example.com',
+            'DEFAULT_TIMEZONE': 'UTC',
+        })
+        from app import create_app, db, Plant, User, ReminderSent, SchedulerLease
+
+        app = create_app('production')
+
+        slot = datetime.now(timezone.utc).strftime('%H:%M')
+        last_watered = date.today() - timedelta(days=10)
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            db.session.execute(User.__table__.insert(), [
+                {'id': i, 'email': f'user{i}@example.com', 'password': 'x', 'reminder_time': slot}
+                for i in range(1, args.users + 1)
+            ])
+            db.session.execute(Plant.__table__.insert(), [
+                {'name': f'Plant {j}', 'last_watered': last_watered, 'water_frequency': 3,
+                 'next_due': last_watered + timedelta(days=3), 'user_id': i}
+                for i in range(1, args.users + 1) for j in range(args.plants)
+            ])
+            db.session.commit()
+
+        failed = False
+        for mode in ('scheduled', 'retry'):
+            smtp.reset()
+            run_round(mode, args.workers)
+            expected = args.users if mode == 'scheduled' else 0
+            ok = smtp.messages == expected
+            failed |= not ok
+            print(f"[{'ok' if ok else 'FAIL'}] {mode}: {smtp.messages} digests sent, expected {expected}")
+
+        with app.app_context():
+            ledger = ReminderSent.query.count()
+            leases = SchedulerLease.query.count()
+            ReminderSent.query.delete()
+            db.session.commit()
+        ok = ledger == args.users * args.plants and leases == 1
+        failed |= not ok
+        print(f"[{'ok' if ok else 'FAIL'}] ledger: {ledger} rows for {args.users * args.plants} plants, {leases} lease")
+
+        timeout = timedelta(minutes=app.config['REMINDER_CLAIM_TIMEOUT_MINUTES'])
+        for mode, workers, expected in (('crash', 1, 1), ('fresh claims', args.workers, 0),
+                                        ('stale claims', args.workers, args.users)):
+            if mode == 'stale claims':
+                with app.app_context():
+                    ReminderSent.query.update({ReminderSent.claimed_at: datetime.utcnow() - timeout * 2})
+                    db.session.commit()
+            smtp.reset()
+            run_round('retry' if mode != 'crash' else mode, workers)
+            ok = smtp.messages == expected
+            failed |= not ok
+            print(f"[{'ok' if ok else 'FAIL'}] {mode}: {smtp.messages} digests sent, expected {expected}")
+
+        with app.app_context():
+            unsent = ReminderSent.query.filter(ReminderSent.status != 'sent').count()
+        failed |= unsent != 0
+        print(f"[{'ok' if not unsent else 'FAIL'}] confirmed: {unsent} ledger rows still pending")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Check that the reminder dispatcher checks each user exactly once per local day.
+
+Users in several timezones, including one that is already a day ahead of
+UTC, get their reminder at the same instant. Each user has one plant due
+on their local today and one due on their local tomorrow. The dispatcher
+then runs:
+
+    outage    once with SMTP unreachable: nothing is sent and no user is
+              marked as done, so the next run retries
+    same day  every minute through the catch-up window, twice per minute:
+              exactly one digest per user, for the plant due on their
+              local date, recorded in the ledger under that date
+    next day  the same minutes a day later: exactly one more digest per user
+
+Exits non-zero if any count is off.
+
+    python benchmarks/check_reminder_dispatcher.py --users 20
+"""
+import argparse
+import contextlib
+import io
+import os
+import socket
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(ROOT))
+
+from smtp_stub import StubSMTPServer
+
+TIMEZONES = ('Pacific/Auckland', 'UTC', 'America/Los_Angeles', None)
+# 19:00 UTC on 9 March is already 08:00 on 10 March in Auckland
+NOW = datetime(2026, 3, 9, 19, 0, tzinfo=timezone.utc)
+
+
+def unused_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def dispatch(greenthumb, app, now, mail_port):
+    """Run the dispatcher at `now`, with Flask-Mail set up for mail_port"""
+    app.config['MAIL_PORT'] = mail_port
+    app.extensions.pop('mail', None)
+    with app.app_context(), contextlib.redirect_stdout(io.StringIO()):
+        greenthumb.dispatch_watering_reminders(now=now)
+
+
+def check(label, ok, detail):
+    print(f"[{'ok' if ok else 'FAIL'}] {label}: {detail}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20, help='users per timezone')
+    args = parser.parse_args()
+
+    with StubSMTPServer() as smtp:
+        os.environ.update({
+            'DATABASE_URL': 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db'),
+            'MAIL_SERVER': '127.0.0.1',
+            'MAIL_USE_TLS': 'False',
+            'MAIL_USERNAME': 'bench@example.com',
+            'DEFAULT_TIMEZONE': 'UTC',
+        })
+        import app as greenthumb
+        from app import db, Plant, ReminderSent, User
+
+        app = greenthumb.create_app('production')
+        catchup = app.config['REMINDER_CATCHUP_MINUTES']
+
+        users = []
+        plants = []
+        local_dates = {}
+        for number, timezone_name in enumerate(TIMEZONES):
+            local_now = NOW.astimezone(ZoneInfo(timezone_name or 'UTC'))
+            for user_id in range(number * args.users + 1, (number + 1) * args.users + 1):
+                local_dates[user_id] = local_now.date()
+                users.append({'id': user_id, 'email': f'user{user_id}@example.com', 'password': 'x',
+                              'timezone': timezone_name, 'reminder_time': local_now.strftime('%H:%M')})
+                for name, days in (('due today', 0), ('due tomorrow', 1)):
+                    due = local_now.date() + timedelta(days=days)
+                    plants.append({'name': name, 'last_watered': due - timedelta(days=7), 'water_frequency': 7,
+                                   'next_due': due, 'user_id': user_id})
+        with app.app_context():
+            db.create_all()
+            db.session.execute(User.__table__.insert(), users)
+            db.session.execute(Plant.__table__.insert(), plants)
+            db.session.commit()
+
+        ok = True
+        dispatch(greenthumb, app, NOW, unused_port())
+        with app.app_context():
+            marked = User.query.filter(User.last_reminder_date.isnot(None)).count()
+            ledger = ReminderSent.query.count()
+        ok &= check('outage', smtp.messages == 0 and marked == 0 and ledger == 0,
+                    f'{smtp.messages} digests, {marked} users marked done, {ledger} ledger rows')
+
+        for day in (0, 1):
+            smtp.reset()
+            for minute in range(catchup + 1):
+                for _ in range(2):
+                    dispatch(greenthumb, app, NOW + timedelta(days=day, minutes=minute), smtp.port)
+            expected = len(users)
+            ok &= check(f'day {day + 1}', smtp.messages == expected,
+                        f'{smtp.messages} digests sent, expected {expected}')
+
+            with app.app_context():
+                ledger = set(db.session.query(Plant.user_id, Plant.name, ReminderSent.sent_on)
+                             .join(ReminderSent, ReminderSent.plant_id == Plant.id)
+                             .filter(ReminderSent.sent_on >= NOW.date() + timedelta(days=day - 1)))
+                marked = {user.id: user.last_reminder_date for user in User.query}
+            if day == 0:
+                expected_ledger = {(user['id'], 'due today', local_dates[user['id']]) for user in users}
+                ok &= check('local date', ledger == expected_ledger,
+                            f'{len(ledger & expected_ledger)} of {len(users)} plants due on their local date '
+                            f'recorded under it, {len(ledger - expected_ledger)} other ledger rows')
+            expected_marks = sum(1 for user_id, value in marked.items()
+                                 if value == local_dates[user_id] + timedelta(days=day))
+            ok &= check(f'day {day + 1} marked', expected_marks == len(users),
+                        f'{expected_marks} of {len(users)} users marked done for their local date')
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Check that the hot plant queries use their indexes.
+
+Seeds a database, runs EXPLAIN for the dashboard, per-user due and global
+due queries, and exits non-zero if a plan does not mention the expected
+index. Runs against a temporary SQLite file by default; pass a Postgres URL
+to check there too.
+
+    python benchmarks/explain_indexes.py
+    python benchmarks/explain_indexes.py --database-url postgresql://localhost/greenthumb_bench
+"""
+import argparse
+import os
+import sys
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def seed(db, Plant, User, users=200, plants_per_user=100):
+    db.drop_all()
+    db.create_all()
+    db.session.execute(User.__table__.insert(), [
+        {'id': i, 'email': f'user{i}@example.com', 'password': 'x'} for i in range(1, users + 1)
+    ])
+    today = date.today()
+    db.session.execute(Plant.__table__.insert(), [
+        {
+            'name': f'Plant {j}',
+            'last_watered': today - timedelta(days=j % 20),
+            'water_frequency': 7,
+            'next_due': today - timedelta(days=j % 20) + timedelta(days=7),
+            'user_id': i,
+        }
+        for i in range(1, users + 1) for j in range(plants_per_user)
+    ])
+    db.session.commit()
+    db.session.execute(db.text('ANALYZE'))
+    db.session.commit()
+
+
+def explain(db, query):
+    sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    prefix = 'EXPLAIN QUERY PLAN ' if db.engine.dialect.name == 'sqlite' else 'EXPLAIN '
+    rows = db.session.execute(db.text(prefix + sql)).all()
+    return '\n'.join(str(row[-1]) for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', help='database to seed and check (it is dropped and recreated)')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'bench.db')
+    from app import create_app, db, Plant, User
+
+    app = create_app('production')
+
+    today = date.today()
+    checks = (
+        ('dashboard', 'ix_plant_user_id_name',
+         lambda: Plant.query.filter_by(user_id=42).order_by(Plant.name)),
+        ('user due', 'ix_plant_user_id_next_due',
+         lambda: Plant.query.filter(Plant.user_id == 42, Plant.next_due <= today)),
+        ('global due', 'ix_plant_next_due',
+         lambda: Plant.query.filter(Plant.next_due <= today - timedelta(days=10))),
+    )
+
+    failed = False
+    with app.app_context():
+        seed(db, Plant, User)
+        print(f"Database: {db.engine.dialect.name}")
+        for label, index_name, build_query in checks:
+            plan = explain(db, build_query())
+            ok = index_name in plan
+            failed |= not ok
+            print(f"\n[{'ok' if ok else 'MISSING'}] {label} -> {index_name}\n{plan}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
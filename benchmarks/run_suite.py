@@ -0,0 +1,262 @@
+"""Benchmark suite: register, login, dashboard, water, add and reminder runs.
+
+A seeded database (see seed_data.py) is built once. Each scenario then
+runs in a fresh process on its own copy of it, with a local stub SMTP
+server. Requests go through the Flask test client on --concurrency
+threads. For each scenario the suite reports throughput, p50/p99 latency
+and the process's peak RSS. --save writes the results as a JSON baseline,
+and --compare checks a run against one and exits non-zero if any figure
+got worse by more than --tolerance percent.
+
+    python benchmarks/run_suite.py --save baseline.json
+    python benchmarks/run_suite.py --compare baseline.json
+    python benchmarks/run_suite.py --scenarios dashboard water --users 1000 --plants 50
+"""
+import argparse
+import itertools
+import json
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+sys.path.insert(0, ROOT)
+
+SCENARIOS = ('register', 'login', 'dashboard', 'water', 'add', 'reminders')
+# Users logged in for the dashboard, water and add scenarios
+ACTIVE_USERS = 20
+PASSWORD = 'secret'
+# figure -> True if a larger value is better
+FIGURES = {'ops_per_second': True, 'p50_ms': False, 'p99_ms': False, 'peak_rss_mib': False}
+
+
+def run_load(operations, concurrency, setup, operation):
+    """Call operation(state, i) `operations` times across threads.
+
+    Each thread first builds its state with setup(thread_number); timing
+    starts once every thread is ready. Returns per-call latencies and the
+    elapsed wall time.
+    """
+    latencies = []
+    lock = threading.Lock()
+    counter = itertools.count()
+    started = []
+    ready = threading.Barrier(concurrency, action=lambda: started.append(time.perf_counter()))
+
+    def worker(number):
+        state = setup(number)
+        ready.wait()
+        while True:
+            i = next(counter)
+            if i >= operations:
+                return
+            start = time.perf_counter()
+            operation(state, i)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker, args=(number,)) for number in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - started[0]
+
+
+def logged_in_client(app, user_id):
+    client = app.test_client()
+    response = client.post('/login', data={'email': f'user{user_id}@example.com', 'password': PASSWORD})
+    assert response.status_code == 302, f'login failed for user {user_id}'
+    return client
+
+
+def active_clients(app, greenthumb, number, concurrency):
+    """Logged-in clients, with their plant ids, for this thread's share of ACTIVE_USERS"""
+    clients = []
+    for user_id in range(number + 1, ACTIVE_USERS + 1, concurrency):
+        with app.app_context():
+            plant_ids = [plant_id for (plant_id,) in greenthumb.db.session.query(greenthumb.Plant.id)
+                         .filter_by(user_id=user_id).order_by(greenthumb.Plant.id)]
+        clients.append((logged_in_client(app, user_id), plant_ids))
+    return clients
+
+
+def expect(response, status):
+    assert response.status_code == status, f'{response.request.path}: {response.status_code}'
+
+
+def run_scenario(name, greenthumb, app, args):
+    concurrency = args.concurrency
+
+    def active(number):
+        return active_clients(app, greenthumb, number, concurrency)
+
+    if name == 'register':
+        return run_load(args.requests, concurrency, lambda number: app.test_client(), lambda client, i: expect(
+            client.post('/register', data={'email': f'new{i}@example.com', 'password': PASSWORD}), 302))
+    if name == 'login':
+        return run_load(args.requests, concurrency, lambda number: app.test_client(), lambda client, i: expect(
+            client.post('/login', data={'email': f'user{i % args.users + 1}@example.com', 'password': PASSWORD}),
+            302))
+    if name == 'dashboard':
+        return run_load(args.requests, concurrency, active, lambda clients, i: expect(
+            clients[i % len(clients)][0].get('/'), 200))
+    if name == 'water':
+        def water(clients, i):
+            client, plant_ids = clients[i % len(clients)]
+            expect(client.post(f'/water/{plant_ids[i // len(clients) % len(plant_ids)]}'), 302)
+        return run_load(args.requests, concurrency, active, water)
+    if name == 'add':
+        return run_load(args.requests, concurrency, active, lambda clients, i: expect(
+            clients[i % len(clients)][0].post('/add', data={
+                'name': f'Bench plant {i}', 'plant_type': 'Tropical',
+                'water_frequency': '7', 'last_watered': '2025-01-01',
+            }), 302))
+    if name == 'reminders':
+        # One full run over every user; the ledger is cleared between runs
+        # (untimed) so each run sends the same digests
+        latencies = []
+        with app.app_context():
+            for _ in range(args.reminder_runs):
+                greenthumb.ReminderSent.query.delete()
+                greenthumb.db.session.commit()
+                start = time.perf_counter()
+                greenthumb.check_watering_reminders()
+                latencies.append(time.perf_counter() - start)
+        return latencies, sum(latencies)
+    raise ValueError(name)
+
+
+def run_child(args):
+    """Run one scenario in this process and print its result as JSON"""
+    import contextlib
+    import io
+
+    from smtp_stub import StubSMTPServer
+
+    with StubSMTPServer(delay=args.smtp_delay) as smtp:
+        os.environ.update({
+            'MAIL_SERVER': '127.0.0.1',
+            'MAIL_PORT': str(smtp.port),
+            'MAIL_USE_TLS': 'False',
+            'MAIL_USERNAME': 'bench@example.com',
+        })
+        import app as greenthumb
+
+        app = greenthumb.create_app('production')
+        with contextlib.redirect_stdout(io.StringIO()):
+            latencies, elapsed = run_scenario(args.child, greenthumb, app, args)
+            # Let queued emails (welcome messages) finish before counting them
+            with app.app_context():
+                while greenthumb.drain_outbox():
+                    pass
+
+    latencies.sort()
+    print('RESULT', json.dumps({
+        'operations': len(latencies),
+        'ops_per_second': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        'peak_rss_mib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'emails': smtp.messages,
+    }))
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, results, tolerance):
+    """Print each figure against the baseline, returning True if any regressed"""
+    if baseline['settings'] != results['settings']:
+        print(f"⚠️  Settings differ from the baseline: {baseline['settings']}")
+    regressed = False
+    print(f"\n{'scenario':>10} {'figure':>15} {'baseline':>10} {'now':>10} {'change':>8}")
+    for scenario, figures in results['results'].items():
+        before = baseline['results'].get(scenario)
+        if before is None:
+            continue
+        for figure, higher_is_better in FIGURES.items():
+            change = (figures[figure] / before[figure] - 1) * 100 if before[figure] else 0.0
+            worse = -change if higher_is_better else change
+            flag = ' ❌' if worse > tolerance else ''
+            regressed |= worse > tolerance
+            print(f"{scenario:>10} {figure:>15} {before[figure]:>10.2f} {figures[figure]:>10.2f} "
+                  f"{change:>+7.1f}%{flag}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--plants', type=int, default=20, help='plants per user')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=200, help='requests per request scenario')
+    parser.add_argument('--concurrency', type=int, default=1, help='client threads')
+    parser.add_argument('--reminder-runs', type=int, default=3)
+    parser.add_argument('--bcrypt-rounds', type=int, default=4,
+                        help='bcrypt cost; low by default so auth scenarios show more than hashing')
+    parser.add_argument('--smtp-delay', type=float, default=0.0, help='seconds the stub waits per message')
+    parser.add_argument('--save', help='write results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON file to compare against')
+    parser.add_argument('--tolerance', type=float, default=10.0, help='percent change allowed by --compare')
+    parser.add_argument('--child', choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    os.environ['BCRYPT_LOG_ROUNDS'] = str(args.bcrypt_rounds)
+    if args.child:
+        run_child(args)
+        return
+
+    workdir = tempfile.mkdtemp()
+    template = os.path.join(workdir, 'seed.db')
+    subprocess.run([sys.executable, os.path.join(HERE, 'seed_data.py'), '--database-url', f'sqlite:///{template}',
+                    '--users', str(args.users), '--plants', str(args.plants), '--seed', str(args.seed),
+                    '--password', PASSWORD], check=True)
+
+    settings = {key: getattr(args, key) for key in
+                ('users', 'plants', 'seed', 'requests', 'concurrency', 'reminder_runs', 'bcrypt_rounds', 'smtp_delay')}
+    results = {'created': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'commit': git_commit(),
+               'python': sys.version.split()[0], 'settings': settings, 'results': {}}
+
+    print(f"{'scenario':>10} {'ops':>6} {'ops/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'peak MiB':>9} {'emails':>7}")
+    for scenario in args.scenarios:
+        database = os.path.join(workdir, f'{scenario}.db')
+        shutil.copyfile(template, database)
+        command = [sys.executable, os.path.abspath(__file__), '--child', scenario] + [
+            argument for key, value in settings.items() for argument in (f"--{key.replace('_', '-')}", str(value))]
+        output = subprocess.run(command, check=True, capture_output=True, text=True,
+                                env=dict(os.environ, DATABASE_URL=f'sqlite:///{database}')).stdout
+        result = json.loads(next(line for line in output.splitlines() if line.startswith('RESULT '))[len('RESULT '):])
+        results['results'][scenario] = result
+        print(f"{scenario:>10} {result['operations']:>6} {result['ops_per_second']:>9.1f} {result['p50_ms']:>9.2f} "
+              f"{result['p99_ms']:>9.2f} {result['peak_rss_mib']:>9.1f} {result['emails']:>7}")
+    shutil.rmtree(workdir)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        sys.exit(1 if compare(baseline, results, args.tolerance) else 0)
+
+
+if __name__ == '__main__':
+    main()
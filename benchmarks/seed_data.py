@@ -0,0 +1,109 @@
+"""Seeded synthetic users and plants for benchmarks and local testing.
+
+The same --seed always produces the same users and plants, dated relative
+to today. Watering frequencies follow common houseplant schedules, and
+last_watered is spread so most plants are on schedule, about a quarter
+are overdue and a few have never been recorded. Every user's password is
+--password.
+
+    python benchmarks/seed_data.py --users 1000 --plants 20 --seed 42
+    python benchmarks/seed_data.py --database-url postgresql://localhost/greenthumb
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# (name, type, usual days between waterings)
+PLANTS = (
+    ('Monstera', 'Tropical', 7), ('Pothos', 'Tropical', 7), ('Peace Lily', 'Tropical', 5),
+    ('Fiddle Leaf Fig', 'Tropical', 7), ('Calathea', 'Tropical', 5), ('Bird of Paradise', 'Tropical', 7),
+    ('Snake Plant', 'Succulent', 14), ('ZZ Plant', 'Succulent', 14), ('Aloe Vera', 'Succulent', 21),
+    ('Jade Plant', 'Succulent', 14), ('Echeveria', 'Succulent', 10), ('Haworthia', 'Succulent', 14),
+    ('Golden Barrel', 'Cactus', 30), ('Christmas Cactus', 'Cactus', 10), ('Bunny Ear Cactus', 'Cactus', 21),
+    ('Basil', 'Herb', 2), ('Mint', 'Herb', 2), ('Rosemary', 'Herb', 5), ('Parsley', 'Herb', 3),
+    ('Boston Fern', 'Fern', 3), ('Maidenhair Fern', 'Fern', 2), ('Bird\'s Nest Fern', 'Fern', 4),
+    ('Spider Plant', 'Foliage', 7), ('Rubber Plant', 'Foliage', 10), ('Philodendron', 'Foliage', 7),
+    ('Chinese Evergreen', 'Foliage', 10), ('Orchid', 'Flowering', 7), ('African Violet', 'Flowering', 4),
+    ('Anthurium', 'Flowering', 5), ('Tomato', 'Vegetable', 1),
+)
+TIMEZONES = ('UTC', 'Europe/London', 'Europe/Berlin', 'America/New_York', 'America/Los_Angeles',
+             'Asia/Kolkata', 'Asia/Tokyo', 'Australia/Sydney', None)
+
+
+def generate(db, User, Plant, users, plants_per_user, password_hash, seed=42, today=None, batch_size=5000):
+    """Insert users 1..users with plants_per_user plants each, returning counts"""
+    rng = random.Random(seed)
+    today = today or date.today()
+
+    db.session.execute(User.__table__.insert(), [
+        {
+            'id': user_id,
+            'email': f'user{user_id}@example.com',
+            'password': password_hash,
+            'reminder_time': f'{rng.randint(6, 21):02d}:{rng.choice((0, 15, 30, 45)):02d}',
+            'timezone': rng.choice(TIMEZONES),
+            'plants_version': 0,
+        }
+        for user_id in range(1, users + 1)
+    ])
+
+    rows = []
+    plants = 0
+    for user_id in range(1, users + 1):
+        for number in range(1, plants_per_user + 1):
+            name, plant_type, frequency = rng.choice(PLANTS)
+            # Owners stretch or shorten the usual schedule a little
+            frequency = max(1, frequency + rng.randint(-1, 2))
+            roll = rng.random()
+            if roll < 0.03:
+                last_watered = None
+            elif roll < 0.75:
+                last_watered = today - timedelta(days=rng.randint(0, frequency))
+            else:
+                last_watered = today - timedelta(days=rng.randint(frequency + 1, frequency * 3 + 2))
+            rows.append({
+                'name': f'{name} {number}',
+                'plant_type': plant_type,
+                'last_watered': last_watered,
+                'water_frequency': frequency,
+                'next_due': last_watered + timedelta(days=frequency) if last_watered else None,
+                'user_id': user_id,
+            })
+            if len(rows) >= batch_size:
+                db.session.execute(Plant.__table__.insert(), rows)
+                plants += len(rows)
+                rows = []
+    if rows:
+        db.session.execute(Plant.__table__.insert(), rows)
+        plants += len(rows)
+    db.session.commit()
+    return {'users': users, 'plants': plants}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--plants', type=int, default=20, help='plants per user')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--password', default='secret')
+    parser.add_argument('--database-url', help='database to seed (default: DATABASE_URL); must be empty')
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    from app import bcrypt, create_app, db, Plant, User
+
+    app = create_app('production')
+    with app.app_context():
+        db.create_all()
+        password_hash = bcrypt.generate_password_hash(args.password).decode('utf-8')
+        counts = generate(db, User, Plant, args.users, args.plants, password_hash, seed=args.seed)
+    print(f"✅ Seeded {counts['users']} users and {counts['plants']} plants (seed {args.seed})")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,24 +6,117 @@ class Config:
     # Security - from environment variables
     SECRET_KEY = config('SECRET_KEY', default='dev-super-secret-key-32-characters-minimum')
     
+    # Password hashing - bcrypt work factor, hashing threads (0 = one per CPU)
+    # and how many more hashes may queue before requests are turned away
+    BCRYPT_LOG_ROUNDS = config('BCRYPT_LOG_ROUNDS', default=12, cast=int)
+    BCRYPT_WORKERS = config('BCRYPT_WORKERS', default=0, cast=int)
+    BCRYPT_MAX_PENDING = config('BCRYPT_MAX_PENDING', default=16, cast=int)
+    
     # Database - from environment variable or default
     SQLALCHEMY_DATABASE_URI = config('DATABASE_URL', default='sqlite:///greenthumb.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     # Email Configuration - from environment variables
-    MAIL_SERVER = 'smtp.gmail.com'
-    MAIL_PORT = 587
-    MAIL_USE_TLS = True
+    MAIL_SERVER = config('MAIL_SERVER', default='smtp.gmail.com')
+    MAIL_PORT = config('MAIL_PORT', default=587, cast=int)
+    MAIL_USE_TLS = config('MAIL_USE_TLS', default=True, cast=bool)
     MAIL_USE_SSL = False
     MAIL_USERNAME = config('MAIL_USERNAME', default='')
     MAIL_PASSWORD = config('MAIL_PASSWORD', default='')
     MAIL_DEFAULT_SENDER = config('MAIL_USERNAME', default='')
+    # Reminder digests share one SMTP connection, reopened after this many messages
+    MAIL_MAX_EMAILS = config('MAIL_MAX_EMAILS', default=100, cast=int)
+    
+    # Outbox - emails queued by requests and delivered by a background sender
+    OUTBOX_WORKERS = config('OUTBOX_WORKERS', default=2, cast=int)
+    OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=50, cast=int)
+    OUTBOX_POLL_SECONDS = config('OUTBOX_POLL_SECONDS', default=30, cast=int)
+    OUTBOX_LEASE_SECONDS = config('OUTBOX_LEASE_SECONDS', default=300, cast=int)
+    OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=5, cast=int)
+    OUTBOX_RETRY_SECONDS = config('OUTBOX_RETRY_SECONDS', default=30, cast=int)
+    # Sent and failed emails are deleted after this many days
+    OUTBOX_RETENTION_DAYS = config('OUTBOX_RETENTION_DAYS', default=7, cast=int)
     
 
     SERVER_NAME = None
     
     # Scheduler settings (disable in production, use Heroku Scheduler)
     SCHEDULER_ENABLED = config('SCHEDULER_ENABLED', default=True, cast=bool)
+    # Only the process holding the database lease dispatches reminders; if it
+    # stops renewing, another process takes over after this many seconds
+    SCHEDULER_LEASE_SECONDS = config('SCHEDULER_LEASE_SECONDS', default=90, cast=int)
+    
+    # Password reset links stop working after this many minutes
+    PASSWORD_RESET_TOKEN_MINUTES = config('PASSWORD_RESET_TOKEN_MINUTES', default=60, cast=int)
+    
+    # Public address of the app, used for links in emails sent outside a request
+    BASE_URL = config('BASE_URL', default='http://localhost:5000')
+    
+    # Reminder job - rows fetched per round trip when streaming due plants
+    REMINDER_BATCH_SIZE = config('REMINDER_BATCH_SIZE', default=1000, cast=int)
+    
+    # Reminder times are read in the user's timezone, or this one if unset.
+    # Slots missed within the catch-up window (e.g. during a restart) still run.
+    DEFAULT_TIMEZONE = config('DEFAULT_TIMEZONE', default='UTC')
+    REMINDER_CATCHUP_MINUTES = config('REMINDER_CATCHUP_MINUTES', default=15, cast=int)
+    # A reminder claimed by a run that stopped before the SMTP server accepted
+    # it is sent by a later run after this long; keep it below the catch-up
+    # window so the dispatcher retries within the same day's slot
+    REMINDER_CLAIM_TIMEOUT_MINUTES = config('REMINDER_CLAIM_TIMEOUT_MINUTES', default=5, cast=int)
+    # Days of sent-reminder ledger kept to de-duplicate sends
+    REMINDER_LEDGER_DAYS = config('REMINDER_LEDGER_DAYS', default=7, cast=int)
+    
+    # Logged-in user cache - users kept in memory per worker and for how long
+    USER_CACHE_SIZE = config('USER_CACHE_SIZE', default=1024, cast=int)
+    USER_CACHE_TTL = config('USER_CACHE_TTL', default=30, cast=int)
+    
+    # Dashboard - plants per page, due plants listed in the alert, and how many
+    # users' status summaries are kept in memory
+    DASHBOARD_PAGE_SIZE = config('DASHBOARD_PAGE_SIZE', default=50, cast=int)
+    DASHBOARD_DUE_PREVIEW = config('DASHBOARD_DUE_PREVIEW', default=10, cast=int)
+    DASHBOARD_CACHE_SIZE = config('DASHBOARD_CACHE_SIZE', default=1024, cast=int)
+    
+    # JSON API - default and maximum plants per page
+    API_PAGE_SIZE = config('API_PAGE_SIZE', default=100, cast=int)
+    API_MAX_PAGE_SIZE = config('API_MAX_PAGE_SIZE', default=500, cast=int)
+    
+    # Plant import/export - rows inserted per transaction, row errors listed
+    # back to the user, and rows read per round trip when exporting
+    IMPORT_CHUNK_SIZE = config('IMPORT_CHUNK_SIZE', default=1000, cast=int)
+    IMPORT_MAX_ERRORS = config('IMPORT_MAX_ERRORS', default=50, cast=int)
+    EXPORT_BATCH_SIZE = config('EXPORT_BATCH_SIZE', default=1000, cast=int)
+    
+    # Watering history - events shown per page
+    HISTORY_PAGE_SIZE = config('HISTORY_PAGE_SIZE', default=20, cast=int)
+    
+    # Request, SQL, reminder and SMTP metrics served at /metrics. Scrapers
+    # send "Authorization: Bearer <METRICS_TOKEN>"; with no token set the
+    # page is only served in development
+    METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+    METRICS_TOKEN = config('METRICS_TOKEN', default='')
+    
+    # Rendered page and template fragment caches, entries kept per worker
+    RENDER_CACHE_ENABLED = config('RENDER_CACHE_ENABLED', default=True, cast=bool)
+    PAGE_CACHE_SIZE = config('PAGE_CACHE_SIZE', default=1024, cast=int)
+    FRAGMENT_CACHE_SIZE = config('FRAGMENT_CACHE_SIZE', default=4096, cast=int)
+    
+    # Static files - serve the fingerprinted copies written by `flask build-static`
+    STATIC_FINGERPRINTS = config('STATIC_FINGERPRINTS', default=True, cast=bool)
+    
+    # SQLite pragmas set on every connection. WAL and busy_timeout let several
+    # workers write without "database is locked"; cache_size is per connection.
+    SQLITE_JOURNAL_MODE = config('SQLITE_JOURNAL_MODE', default='WAL')
+    SQLITE_SYNCHRONOUS = config('SQLITE_SYNCHRONOUS', default='NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = config('SQLITE_BUSY_TIMEOUT_MS', default=5000, cast=int)
+    SQLITE_CACHE_SIZE_KIB = config('SQLITE_CACHE_SIZE_KIB', default=16384, cast=int)
+    SQLITE_MMAP_SIZE = config('SQLITE_MMAP_SIZE', default=128 * 1024 * 1024, cast=int)
+    
+    # Optional writer thread per worker that commits queued plant writes
+    # (add, water) together, up to this many per transaction; requests give
+    # up waiting for their write after the timeout
+    WRITE_QUEUE_ENABLED = config('WRITE_QUEUE_ENABLED', default=False, cast=bool)
+    WRITE_QUEUE_MAX_BATCH = config('WRITE_QUEUE_MAX_BATCH', default=64, cast=int)
+    WRITE_QUEUE_TIMEOUT_SECONDS = config('WRITE_QUEUE_TIMEOUT_SECONDS', default=30, cast=float)
     
     # Performance optimization
     SQLALCHEMY_ENGINE_OPTIONS = {
@@ -34,6 +127,9 @@ class Config:
 class DevelopmentConfig(Config):
     DEBUG = True
     SCHEDULER_ENABLED = True
+    # Edits to static files and templates show up without a rebuild
+    STATIC_FINGERPRINTS = False
+    RENDER_CACHE_ENABLED = False
 
 class ProductionConfig(Config):
     DEBUG = False
@@ -42,4 +138,13 @@ class ProductionConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
-    WTF_CSRF_ENABLED = False
\ No newline at end of file
+    WTF_CSRF_ENABLED = False
+
+
+# Names accepted by create_app(); 'default' takes every setting from the environment
+config_by_name = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+    'testing': TestingConfig,
+    'default': Config,
+}